@@ -1,8 +1,14 @@
 from django.contrib import admin
+from django.core.exceptions import PermissionDenied
+from django.template.response import TemplateResponse
+from django.urls import path
+from .archive import partitions, search_archive
+from .changelist import KeysetChangeList
 from .models import (
     Portfolio, Project, Skill, Technology, 
-    Certificate, Recommendation, ContactMessage
+    Certificate, Recommendation, ContactMessage, EmailOutbox
 )
+from .search import filter_messages, is_available as search_available
 
 
 @admin.register(Portfolio)
@@ -58,5 +64,60 @@ class ContactMessageAdmin(admin.ModelAdmin):
     list_display = ['name', 'email', 'created_at', 'is_read']
     list_filter = ['is_read', 'created_at']
     search_fields = ['name', 'email', 'message']
-    list_editable = ['is_read']
+    search_help_text = 'Matches messages containing every word of the search.'
     readonly_fields = ['created_at']
+    # Newest first through the created_at index; see KeysetChangeList
+    ordering = ['-created_at', '-id']
+    sortable_by = []
+    show_full_result_count = False
+    actions = ['mark_read', 'mark_unread']
+
+    def get_changelist(self, request, **kwargs):
+        return KeysetChangeList
+
+    def get_urls(self):
+        archive = path(
+            'archive/', self.admin_site.admin_view(self.archive_view),
+            name='portfolio_contactmessage_archive',
+        )
+        return [archive] + super().get_urls()
+
+    def archive_view(self, request):
+        """Read-only search of the messages moved out by archive_messages"""
+        if not self.has_view_permission(request):
+            raise PermissionDenied
+        query = request.GET.get('q', '').strip()
+        month = request.GET.get('month', '')
+        context = {
+            **self.admin_site.each_context(request),
+            'opts': self.model._meta,
+            'title': 'Archived contact messages',
+            'query': query,
+            'month': month,
+            'months': [partition_month for partition_month, _ in partitions()],
+            'results': search_archive(query, month=month) if query else None,
+        }
+        return TemplateResponse(request, 'admin/portfolio/contactmessage/archive.html', context)
+
+    def get_search_results(self, request, queryset, search_term):
+        if search_term and search_available():
+            return filter_messages(queryset, search_term), False
+        return super().get_search_results(request, queryset, search_term)
+
+    @admin.action(description='Mark selected messages as read')
+    def mark_read(self, request, queryset):
+        updated = queryset.filter(is_read=False).update(is_read=True)
+        self.message_user(request, f'{updated} messages marked as read.')
+
+    @admin.action(description='Mark selected messages as unread')
+    def mark_unread(self, request, queryset):
+        updated = queryset.filter(is_read=True).update(is_read=False)
+        self.message_user(request, f'{updated} messages marked as unread.')
+
+
+@admin.register(EmailOutbox)
+class EmailOutboxAdmin(admin.ModelAdmin):
+    list_display = ['contact_message', 'status', 'attempts', 'next_attempt_at', 'sent_at']
+    list_filter = ['status']
+    list_select_related = ['contact_message']
+    readonly_fields = ['contact_message', 'attempts', 'last_error', 'created_at', 'sent_at']
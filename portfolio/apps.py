@@ -4,3 +4,12 @@ from django.apps import AppConfig
 class PortfolioConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'portfolio'
+
+    def ready(self):
+        from django.db.backends.signals import connection_created
+        from . import signals  # noqa: F401
+        from .db import configure_sqlite
+        from .metrics import instrument_connection
+
+        connection_created.connect(configure_sqlite)
+        connection_created.connect(instrument_connection)
@@ -0,0 +1,166 @@
+"""
+Retention of contact messages.
+
+archive_messages() moves messages older than the retention period out of
+the database into gzip-compressed JSON-lines files, one per month of
+``created_at`` (``ARCHIVE_DIR/2025/messages-2025-01.jsonl.gz``). Each chunk
+is appended to its file as a new gzip member and synced to disk before the
+same rows are deleted, so an interrupted run can at worst leave a message
+both archived and in the table. The next run archives it again and readers
+skip ids they have already seen.
+
+search_archive() streams through the files newest month first, so the
+archive can be searched without loading it back into the database.
+"""
+import gzip
+import json
+import os
+import re
+from collections import deque
+from datetime import timedelta, timezone as dt_timezone
+from pathlib import Path
+
+from django.conf import settings
+from django.db import connection, transaction
+from django.utils import timezone
+
+from .models import ContactMessage
+
+
+ARCHIVE_DIR = Path(getattr(settings, 'CONTACT_ARCHIVE_DIR', settings.BASE_DIR / 'archive' / 'messages'))
+RETENTION_DAYS = getattr(settings, 'CONTACT_RETENTION_DAYS', 365)
+
+FIELDS = ['id', 'name', 'email', 'message', 'created_at', 'is_read', 'content_hash']
+
+PARTITION_RE = re.compile(r'messages-(\d{4})-(\d{2})\.jsonl\.gz$')
+TERM_RE = re.compile(r'\w+')
+
+
+def partition_path(created_at, root=None):
+    root = ARCHIVE_DIR if root is None else Path(root)
+    return root / f'{created_at.year:04}' / f'messages-{created_at.year:04}-{created_at.month:02}.jsonl.gz'
+
+
+def partitions(root=None):
+    """Return ``[(month, path)]`` of the archive files, newest month first"""
+    root = ARCHIVE_DIR if root is None else Path(root)
+    found = []
+    for path in root.glob('*/messages-*.jsonl.gz'):
+        match = PARTITION_RE.search(path.name)
+        if match:
+            found.append((f'{match[1]}-{match[2]}', path))
+    return sorted(found, reverse=True)
+
+
+def write_records(rows, root=None):
+    """Append message rows to their monthly files and sync them to disk"""
+    by_path = {}
+    for row in rows:
+        # Partition by UTC month, whatever the server time zone
+        created_at = row['created_at'].astimezone(dt_timezone.utc)
+        by_path.setdefault(partition_path(created_at, root), []).append(row)
+
+    for path, path_rows in by_path.items():
+        path.parent.mkdir(parents=True, exist_ok=True)
+        lines = ''.join(
+            json.dumps({**row, 'created_at': row['created_at'].isoformat()}, ensure_ascii=False) + '\n'
+            for row in path_rows
+        )
+        with open(path, 'ab') as raw:
+            with gzip.GzipFile(fileobj=raw, mode='wb', mtime=0) as f:
+                f.write(lines.encode('utf-8'))
+            raw.flush()
+            os.fsync(raw.fileno())
+
+
+def archive_messages(older_than=None, chunk_size=1000, root=None, progress=None):
+    """
+    Move messages created before ``now - older_than`` to the archive, oldest
+    first, one chunk per transaction. Returns the number of messages moved.
+    """
+    if older_than is None:
+        older_than = timedelta(days=RETENTION_DAYS)
+    cutoff = timezone.now() - older_than
+    moved = 0
+    while True:
+        rows = list(
+            ContactMessage.objects.filter(created_at__lt=cutoff)
+            .order_by('created_at', 'id').values(*FIELDS)[:chunk_size]
+        )
+        if not rows:
+            break
+        write_records(rows, root)
+        with transaction.atomic():
+            # Also removes the messages' outbox rows and search index entries
+            ContactMessage.objects.filter(pk__in=[row['id'] for row in rows]).delete()
+        moved += len(rows)
+        if progress:
+            progress(moved)
+    return moved
+
+
+def incremental_vacuum(pages=0):
+    """
+    Return up to ``pages`` free pages (all of them with 0) of an SQLite
+    database in incremental auto-vacuum mode to the file system. Returns the
+    number of pages freed, or None when the database is not in that mode.
+    """
+    if connection.vendor != 'sqlite':
+        return None
+    with connection.cursor() as cursor:
+        cursor.execute('PRAGMA auto_vacuum')
+        if cursor.fetchone()[0] != 2:
+            return None
+        cursor.execute('PRAGMA freelist_count')
+        before = cursor.fetchone()[0]
+        # The pragma frees one page per step; executescript() steps it to the
+        # end where a cursor stops after the first page
+        connection.connection.executescript(f'PRAGMA incremental_vacuum({int(pages)});')
+        cursor.execute('PRAGMA freelist_count')
+        return before - cursor.fetchone()[0]
+
+
+def enable_incremental_vacuum():
+    """Switch an SQLite database to incremental auto-vacuum; rewrites the whole file once"""
+    with connection.cursor() as cursor:
+        cursor.execute('PRAGMA auto_vacuum = INCREMENTAL')
+        cursor.execute('VACUUM')
+
+
+def read_partition(path):
+    """Yield the raw JSON lines of one archive file"""
+    with gzip.open(path, 'rt', encoding='utf-8') as f:
+        yield from f
+
+
+def search_archive(query, limit=100, month=None, root=None):
+    """
+    Return up to ``limit`` archived messages containing every word of
+    ``query`` (case-insensitive), newest first, optionally within one
+    ``YYYY-MM`` month. Each result has the archived fields, with
+    ``created_at`` as an ISO 8601 string.
+    """
+    terms = [term.lower() for term in TERM_RE.findall(query)]
+    results = []
+    seen = set()
+    for partition_month, path in partitions(root):
+        if month and partition_month != month:
+            continue
+        # The newest distinct matches of this month, once the file has been read.
+        # A message archived twice keeps the place of its first copy, and
+        # repeats do not take up any of the remaining slots.
+        newest = deque(maxlen=limit - len(results))
+        for line in read_partition(path):
+            lowered = line.lower()
+            if all(term in lowered for term in terms):
+                record = json.loads(line)
+                if record['id'] in seen:
+                    continue
+                haystack = f'{record["name"]} {record["email"]} {record["message"]}'.lower()
+                if all(term in haystack for term in terms):
+                    seen.add(record['id'])
+                    newest.append(record)
+        results.extend(reversed(newest))
+        if len(results) >= limit:
+            break
+    return results
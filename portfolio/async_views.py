@@ -0,0 +1,132 @@
+"""
+Async versions of the public views, used when the site is served over ASGI.
+
+The views never block the event loop while waiting on the database, but
+their queries still run one after another: sync_to_async and the async ORM
+hand every query to the one thread that owns the database connections, so
+gathering them would not overlap anything. They share the page cache, the
+conditional GET handling and the helpers of the sync views, so both paths
+render identical pages.
+"""
+from itertools import islice
+
+from asgiref.sync import sync_to_async
+from django.contrib import messages
+from django.http import HttpResponseNotAllowed, JsonResponse, StreamingHttpResponse
+from django.shortcuts import render, redirect
+
+from .models import Project
+from .cache import cached_page, conditional_content
+from .pagination import PAGE_SIZE, InvalidCursor, parse_limit
+from .snapshot import get_snapshot
+from .views import (
+    PROJECT_QUERY_PARAMS, filter_config, filter_payload, iter_filtered_projects, project_page,
+    stream_projects_json,
+)
+
+
+async def alist(queryset):
+    """Evaluate a queryset (prefetches included) without blocking the event loop"""
+    return [obj async for obj in queryset]
+
+
+arender = sync_to_async(render)
+
+
+@conditional_content
+@cached_page('home')
+async def home(request):
+    """Homepage view"""
+    snapshot = await sync_to_async(get_snapshot)()
+    featured_projects = await alist(
+        Project.objects.filter(featured=True).prefetch_related('technologies').order_by('order')[:3]
+    )
+
+    context = {
+        'portfolio': snapshot.portfolio,
+        'featured_projects': featured_projects,
+        # Left lazy like in the sync view; only evaluated if a template uses it
+        'all_projects': Project.objects.prefetch_related('technologies').order_by('order')[:6],
+        'skills': snapshot.skills[:8],
+    }
+    return await arender(request, 'portfolio/home.html', context)
+
+
+@conditional_content
+@cached_page('about')
+async def about(request):
+    """About page view"""
+    snapshot = await sync_to_async(get_snapshot)()
+    context = {
+        'portfolio': snapshot.portfolio,
+        'skill_categories': snapshot.skill_categories,
+        'certificates': snapshot.certificates,
+        'recommendations': snapshot.recommendations,
+    }
+    return await arender(request, 'portfolio/about.html', context)
+
+
+@conditional_content
+@cached_page('projects', query_params=PROJECT_QUERY_PARAMS)
+async def projects(request):
+    """Projects page view"""
+    try:
+        projects, next_cursor = await sync_to_async(project_page)(request, PAGE_SIZE)
+    except InvalidCursor:
+        return redirect('projects')
+    snapshot = await sync_to_async(get_snapshot)()
+
+    context = {
+        'portfolio': snapshot.portfolio,
+        'projects': projects,
+        'next_cursor': next_cursor,
+        'technologies': snapshot.technologies,
+        'selected_tech': request.GET.get('tech'),
+        'match_mode': request.GET.get('mode', ''),
+        'filter_config': await sync_to_async(filter_config)(),
+    }
+    return await arender(request, 'portfolio/projects.html', context)
+
+
+@conditional_content
+@cached_page('project_detail', object_kwarg='project_id')
+async def project_detail(request, project_id):
+    """Project detail view"""
+    try:
+        project = await Project.objects.prefetch_related('technologies').aget(id=project_id)
+    except Project.DoesNotExist:
+        messages.error(request, 'Project not found.')
+        return redirect('projects')
+
+    context = {
+        'portfolio': (await sync_to_async(get_snapshot)()).portfolio,
+        'project': project,
+    }
+    return await arender(request, 'portfolio/project_detail.html', context)
+
+
+async def stream_filtered_projects(request, batch_size=100):
+    """Async iterator over the streamed filter payload"""
+    chunks = stream_projects_json(iter_filtered_projects(request))
+    next_batch = sync_to_async(lambda: list(islice(chunks, batch_size)))
+    while batch := await next_batch():
+        for chunk in batch:
+            yield chunk
+
+
+@conditional_content
+async def filter_projects(request):
+    """AJAX endpoint for filtering projects by technology, see views.filter_projects"""
+    # require_http_methods() only wraps sync views in this Django version
+    if request.method != 'GET':
+        return HttpResponseNotAllowed(['GET'])
+
+    if request.GET.get('stream') == '1':
+        return StreamingHttpResponse(stream_filtered_projects(request), content_type='application/json')
+
+    try:
+        projects, next_cursor = await sync_to_async(project_page)(request, parse_limit(request))
+    except InvalidCursor:
+        return JsonResponse({'error': 'Invalid cursor'}, status=400)
+
+    return JsonResponse(await sync_to_async(filter_payload)(request, projects, next_cursor))
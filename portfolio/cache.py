@@ -0,0 +1,217 @@
+"""
+Rendered-page cache for the public views.
+
+Each cached page is stored under a key that embeds a version number for the
+page. Saving or deleting a model bumps the versions of the pages that render
+it (see signals.py), so stale entries are simply never read again and expire
+on their own.
+
+Whether a request may use the cache depends on its cookies, so every
+response of a cached view varies on Cookie, and a cached copy keeps the
+headers downstream caches rely on. Only the query parameters a view reads
+are part of the key, so junk query strings share the entry of the bare URL.
+
+The same signals bump a single-row ContentVersion stamp, which backs the
+ETag / Last-Modified validators used for conditional GETs.
+
+Both decorators accept sync and async views.
+"""
+import asyncio
+import hashlib
+import time
+from functools import wraps
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+from django.http import HttpResponse
+from django.utils.cache import get_conditional_response, patch_vary_headers
+from django.utils.http import http_date, quote_etag, urlencode
+
+from .metrics import note_cache
+from .models import ContentVersion
+
+
+PAGE_CACHE_TIMEOUT = getattr(settings, 'PAGE_CACHE_TIMEOUT', 60 * 60 * 24)
+
+# Bump when the format of cached entries changes, so old entries are ignored
+PAGE_ENTRY_VERSION = 2
+# Headers stored with a cached page and restored on every hit
+CACHED_HEADERS = ('Content-Type', 'Content-Language', 'Cache-Control', 'Vary')
+
+CONTENT_VERSION_KEY = 'content-version'
+# Upper bound on how long a worker may keep serving an outdated version if
+# a concurrent reader re-cached it just before an edit was committed.
+CONTENT_VERSION_TIMEOUT = 60
+
+
+def page_version(page):
+    """Return the current version of a page, initialising it if needed"""
+    key = f'page-version:{page}'
+    version = cache.get(key)
+    if version is None:
+        # A fresh, unique value so that entries written before an eviction
+        # of the version key can never be mistaken for current ones.
+        cache.add(key, time.time_ns(), None)
+        version = cache.get(key)
+    return version
+
+
+def invalidate_pages(*pages):
+    """Bump the version of each page so its cached copies are ignored"""
+    cache.set_many({f'page-version:{page}': time.time_ns() for page in pages}, None)
+
+
+def is_cacheable_request(request):
+    """
+    Only anonymous GETs without pending flash messages are served from cache.
+
+    Pages rendered for export_static_site differ from the served ones, so
+    they bypass the cache as well.
+    """
+    return (
+        not getattr(settings, 'STATIC_EXPORT', False)
+        and request.method in ('GET', 'HEAD')
+        and settings.SESSION_COOKIE_NAME not in request.COOKIES
+        and 'messages' not in request.COOKIES
+    )
+
+
+def _page_key(request, page, object_kwarg, query_params, kwargs):
+    versions = [page_version(page)]
+    if object_kwarg is not None:
+        versions.append(page_version(f'{page}:{kwargs[object_kwarg]}'))
+    query = urlencode(
+        [(name, request.GET.getlist(name)) for name in query_params if name in request.GET],
+        doseq=True,
+    )
+    path_hash = hashlib.md5(f'{request.path}?{query}'.encode()).hexdigest()
+    return 'page:{}:{}:{}:{}'.format(
+        PAGE_ENTRY_VERSION, page, '.'.join(map(str, versions)), path_hash
+    )
+
+
+def _cached_response(key):
+    cached = cache.get(key)
+    if cached is not None:
+        content, headers = cached
+        return HttpResponse(content, headers=headers)
+
+
+def _store_response(key, response):
+    if response.status_code == 200 and not response.streaming and not response.cookies:
+        headers = {name: response[name] for name in CACHED_HEADERS if response.has_header(name)}
+        cache.set(key, (response.content, headers), PAGE_CACHE_TIMEOUT)
+
+
+def cached_page(page, object_kwarg=None, query_params=()):
+    """
+    Cache the rendered response of a view under the given page name.
+
+    When ``object_kwarg`` is set the view also depends on the version of the
+    object named by that URL kwarg, e.g. ``project_detail:42``.
+    ``query_params`` names the GET parameters the view reads; others are
+    left out of the cache key.
+    """
+    def decorator(view_func):
+        if asyncio.iscoroutinefunction(view_func):
+            @wraps(view_func)
+            async def async_wrapper(request, *args, **kwargs):
+                if not is_cacheable_request(request):
+                    note_cache('bypass')
+                    response = await view_func(request, *args, **kwargs)
+                else:
+                    key = await sync_to_async(_page_key)(request, page, object_kwarg, query_params, kwargs)
+                    response = await sync_to_async(_cached_response)(key)
+                    note_cache('miss' if response is None else 'hit')
+                    if response is None:
+                        response = await view_func(request, *args, **kwargs)
+                        await sync_to_async(_store_response)(key, response)
+                patch_vary_headers(response, ('Cookie',))
+                return response
+            return async_wrapper
+
+        @wraps(view_func)
+        def wrapper(request, *args, **kwargs):
+            if not is_cacheable_request(request):
+                note_cache('bypass')
+                response = view_func(request, *args, **kwargs)
+            else:
+                key = _page_key(request, page, object_kwarg, query_params, kwargs)
+                response = _cached_response(key)
+                note_cache('miss' if response is None else 'hit')
+                if response is None:
+                    response = view_func(request, *args, **kwargs)
+                    _store_response(key, response)
+            patch_vary_headers(response, ('Cookie',))
+            return response
+        return wrapper
+    return decorator
+
+
+def get_content_version():
+    """Return ``(version, updated_at)`` of the public content"""
+    value = cache.get(CONTENT_VERSION_KEY)
+    if value is None:
+        value = ContentVersion.objects.filter(pk=1).values_list('version', 'updated_at').first()
+        value = value or (0, None)
+        cache.set(CONTENT_VERSION_KEY, value, CONTENT_VERSION_TIMEOUT)
+    return value
+
+
+def bump_content_version():
+    """Record that public content changed"""
+    ContentVersion.bump()
+    transaction.on_commit(lambda: cache.delete(CONTENT_VERSION_KEY))
+
+
+def _validators(version):
+    number, updated_at = version
+    return quote_etag(f'v{number}'), int(updated_at.timestamp()) if updated_at else None
+
+
+def _add_validators(request, response, etag, last_modified):
+    if request.method in ('GET', 'HEAD'):
+        if last_modified and not response.has_header('Last-Modified'):
+            response.headers['Last-Modified'] = http_date(last_modified)
+        response.headers.setdefault('ETag', etag)
+    patch_vary_headers(response, ('Cookie',))
+    return response
+
+
+def conditional_content(view_func):
+    """
+    Answer If-None-Match / If-Modified-Since with 304 before the view runs.
+
+    Validators come from the content version, mirroring Django's condition()
+    decorator, which only supports sync views in this Django version. Like
+    the page cache, they are skipped for requests with a session or pending
+    flash messages, whose pages differ from the shared content.
+    """
+    if asyncio.iscoroutinefunction(view_func):
+        @wraps(view_func)
+        async def async_wrapper(request, *args, **kwargs):
+            if not is_cacheable_request(request):
+                return await view_func(request, *args, **kwargs)
+            etag, last_modified = _validators(await sync_to_async(get_content_version)())
+            response = get_conditional_response(request, etag=etag, last_modified=last_modified)
+            if response is None:
+                response = await view_func(request, *args, **kwargs)
+            else:
+                note_cache('not-modified')
+            return _add_validators(request, response, etag, last_modified)
+        return async_wrapper
+
+    @wraps(view_func)
+    def wrapper(request, *args, **kwargs):
+        if not is_cacheable_request(request):
+            return view_func(request, *args, **kwargs)
+        etag, last_modified = _validators(get_content_version())
+        response = get_conditional_response(request, etag=etag, last_modified=last_modified)
+        if response is None:
+            response = view_func(request, *args, **kwargs)
+        else:
+            note_cache('not-modified')
+        return _add_validators(request, response, etag, last_modified)
+    return wrapper
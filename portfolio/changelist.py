@@ -0,0 +1,139 @@
+"""
+Admin changelist for tables too large to count or page through with OFFSET.
+
+KeysetChangeList lists rows newest first by ``(created_at, id)`` and pages
+with an opaque ``?cursor=`` like the public project pages, so every page is
+an index range scan however deep it is. Instead of exact COUNT(*) queries it
+counts at most COUNT_LIMIT matching rows, and reports the database's row
+estimate for an unfiltered list that is longer than that.
+"""
+import base64
+import binascii
+from datetime import timedelta
+
+from django.contrib.admin.options import IncorrectLookupParameters
+from django.contrib.admin.views.main import ChangeList
+from django.db import DatabaseError, connection
+from django.db.models import Q
+
+from .pagination import EPOCH, InvalidCursor
+
+
+CURSOR_VAR = 'cursor'
+COUNT_LIMIT = 10000
+
+
+def encode_cursor(obj):
+    micros = (obj.created_at - EPOCH) // timedelta(microseconds=1)
+    return base64.urlsafe_b64encode(f'{micros}.{obj.pk}'.encode()).decode().rstrip('=')
+
+
+def decode_cursor(value):
+    """Return the ``(created_at, pk)`` encoded in a cursor, or None for the first page"""
+    if not value:
+        return None
+    try:
+        raw = base64.urlsafe_b64decode(value + '=' * (-len(value) % 4)).decode()
+        micros, pk = (int(part) for part in raw.split('.'))
+    except (binascii.Error, UnicodeDecodeError, ValueError):
+        raise InvalidCursor(value)
+    return EPOCH + timedelta(microseconds=micros), pk
+
+
+def keyset_filter(queryset, key):
+    """Restrict a newest-first queryset to rows older than the given key"""
+    created_at, pk = key
+    # The created_at__lte range lets the index bound the scan
+    return queryset.filter(
+        Q(created_at__lte=created_at),
+        Q(created_at__lt=created_at) | Q(id__lt=pk),
+    )
+
+
+def table_row_estimate(model):
+    """Return the row count the database keeps in its statistics, or None without statistics"""
+    table = model._meta.db_table
+    try:
+        with connection.cursor() as cursor:
+            if connection.vendor == 'postgresql':
+                cursor.execute('SELECT reltuples::bigint FROM pg_class WHERE oid = %s::regclass', [table])
+            elif connection.vendor == 'mysql':
+                cursor.execute(
+                    'SELECT table_rows FROM information_schema.tables '
+                    'WHERE table_schema = DATABASE() AND table_name = %s', [table]
+                )
+            elif connection.vendor == 'sqlite':
+                # Written by ANALYZE; the first figure of every index's stat is the row count
+                cursor.execute('SELECT stat FROM sqlite_stat1 WHERE tbl = %s LIMIT 1', [table])
+            else:
+                return None
+            row = cursor.fetchone()
+    except DatabaseError:
+        return None
+    if row is None or row[0] is None:
+        return None
+    estimate = int(str(row[0]).split()[0])
+    return estimate if estimate >= 0 else None
+
+
+class KeysetChangeList(ChangeList):
+    """Newest-first changelist with cursor pagination and bounded counts"""
+
+    def __init__(self, request, *args, **kwargs):
+        super().__init__(request, *args, **kwargs)
+        # Filter, search and sort links start again from the newest row
+        self.params.pop(CURSOR_VAR, None)
+
+    def get_filters_params(self, params=None):
+        lookup_params = super().get_filters_params(params)
+        lookup_params.pop(CURSOR_VAR, None)
+        return lookup_params
+
+    def get_ordering(self, request, queryset):
+        return ['-created_at', '-id']
+
+    def get_results(self, request):
+        try:
+            self.cursor = decode_cursor(request.GET.get(CURSOR_VAR))
+        except InvalidCursor:
+            raise IncorrectLookupParameters
+        queryset = self.queryset if self.cursor is None else keyset_filter(self.queryset, self.cursor)
+        rows = list(queryset[:self.list_per_page + 1])
+        self.next_cursor = encode_cursor(rows[self.list_per_page - 1]) if len(rows) > self.list_per_page else None
+
+        self.result_count, self.result_count_exact = self.count_results()
+        self.show_full_result_count = False
+        self.full_result_count = None
+        self.show_admin_actions = True
+        self.result_list = rows[:self.list_per_page]
+        self.can_show_all = False
+        # Page links come from the cursors, not from a paginator
+        self.multi_page = False
+        self.paginator = None
+
+    def count_results(self):
+        """Return ``(count, exact)`` without counting past COUNT_LIMIT rows"""
+        count = self.queryset.order_by()[:COUNT_LIMIT + 1].count()
+        if count <= COUNT_LIMIT:
+            return count, True
+        if not (self.has_active_filters or self.query):
+            estimate = table_row_estimate(self.model)
+            if estimate is not None and estimate > COUNT_LIMIT:
+                return estimate, False
+        return COUNT_LIMIT, False
+
+    @property
+    def result_count_label(self):
+        if self.result_count_exact:
+            return str(self.result_count)
+        if self.result_count > COUNT_LIMIT:
+            return f'about {self.result_count}'
+        return f'{self.result_count}+'
+
+    @property
+    def first_page_url(self):
+        return self.get_query_string() if self.cursor else None
+
+    @property
+    def next_page_url(self):
+        return self.get_query_string({CURSOR_VAR: self.next_cursor}) if self.next_cursor else None
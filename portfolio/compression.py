@@ -0,0 +1,44 @@
+"""
+Pre-compressed ``.gz`` / ``.br`` siblings for text assets.
+
+Brotli output needs the optional ``brotli`` package; without it only gzip
+variants are written.
+"""
+import gzip
+import os
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+
+COMPRESSIBLE_EXTENSIONS = {
+    '.html', '.css', '.js', '.json', '.svg', '.txt', '.xml', '.map',
+}
+
+ENCODING_SUFFIXES = {'br': '.br', 'gzip': '.gz'}
+
+
+def is_compressible(path):
+    return os.path.splitext(str(path))[1].lower() in COMPRESSIBLE_EXTENSIONS
+
+
+def compressed_variants(data):
+    """Return ``{suffix: bytes}`` for each encoding that actually shrinks ``data``"""
+    variants = {'.gz': gzip.compress(data, compresslevel=9, mtime=0)}
+    if brotli is not None:
+        variants['.br'] = brotli.compress(data, quality=11)
+    return {suffix: body for suffix, body in variants.items() if len(body) < len(data)}
+
+
+def write_compressed_variants(path, data):
+    """Write the compressed siblings of ``path`` and remove outdated ones"""
+    variants = compressed_variants(data)
+    for suffix in ENCODING_SUFFIXES.values():
+        sibling = f'{path}{suffix}'
+        if suffix in variants:
+            with open(sibling, 'wb') as f:
+                f.write(variants[suffix])
+        elif os.path.exists(sibling):
+            os.remove(sibling)
@@ -0,0 +1,6 @@
+from django.conf import settings
+
+
+def static_export(request):
+    """Tell templates when they are rendered for export_static_site"""
+    return {'static_export': getattr(settings, 'STATIC_EXPORT', False)}
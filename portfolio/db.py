@@ -0,0 +1,57 @@
+"""
+SQLite connection tuning.
+
+Every new SQLite connection is switched to WAL so readers never block the
+writer, and given a busy timeout so concurrent writers queue for the lock
+instead of failing with "database is locked".
+
+A deferred transaction (Django's plain BEGIN) that reads before it writes
+cannot wait for the lock: once another writer commits, its snapshot is stale
+and SQLite fails at once with SQLITE_BUSY_SNAPSHOT, ignoring busy_timeout.
+Writes that must not fail open their transaction with immediate_atomic(),
+which takes the write lock up front and so does wait.
+"""
+from contextlib import contextmanager
+
+from django.conf import settings
+from django.db import transaction
+
+
+SQLITE_PRAGMAS = getattr(settings, 'SQLITE_PRAGMAS', {
+    'journal_mode': 'WAL',
+    'synchronous': 'NORMAL',
+    'busy_timeout': 20000,
+    'temp_store': 'MEMORY',
+    'cache_size': -20000,
+    'mmap_size': 128 * 1024 * 1024,
+})
+
+
+@contextmanager
+def immediate_atomic(using=None):
+    """transaction.atomic() that starts with BEGIN IMMEDIATE on SQLite"""
+    connection = transaction.get_connection(using)
+    if connection.vendor != 'sqlite' or connection.in_atomic_block:
+        with transaction.atomic(using=using):
+            yield
+        return
+
+    # Django 4.2 has no transaction mode option, so swap the statement
+    # atomic() uses to open the outermost transaction for this block only
+    connection._start_transaction_under_autocommit = (
+        lambda: connection.cursor().execute('BEGIN IMMEDIATE')
+    )
+    try:
+        with transaction.atomic(using=using):
+            yield
+    finally:
+        del connection._start_transaction_under_autocommit
+
+
+def configure_sqlite(sender, connection, **kwargs):
+    """connection_created receiver applying SQLITE_PRAGMAS"""
+    if connection.vendor != 'sqlite':
+        return
+    with connection.cursor() as cursor:
+        for name, value in SQLITE_PRAGMAS.items():
+            cursor.execute(f'PRAGMA {name} = {value}')
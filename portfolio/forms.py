@@ -1,4 +1,9 @@
+from datetime import timedelta
+
 from django import forms
+from django.conf import settings
+from django.utils import timezone
+
 from .models import ContactMessage
 
 
@@ -32,3 +37,16 @@ class ContactForm(forms.ModelForm):
         self.fields['name'].label = ''
         self.fields['email'].label = ''
         self.fields['message'].label = ''
+
+    def clean(self):
+        cleaned_data = super().clean()
+        email = cleaned_data.get('email')
+        message = cleaned_data.get('message')
+        if email and message:
+            # Indexed lookup on the digest, so no scan of the message table
+            content_hash = ContactMessage.make_content_hash(email, message)
+            since = timezone.now() - timedelta(seconds=settings.CONTACT_DUPLICATE_WINDOW)
+            if ContactMessage.objects.filter(content_hash=content_hash, created_at__gte=since).exists():
+                raise forms.ValidationError('You have already sent this message.')
+            self.instance.content_hash = content_hash
+        return cleaned_data
@@ -0,0 +1,118 @@
+"""
+Resized JPEG/WebP derivatives of uploaded images.
+
+Derivatives are written next to the media files under ``derivatives/`` along
+with a small JSON sidecar describing them. The sidecar is cached, so
+templates can build ``srcset`` attributes without touching the disk.
+Generating them is slow, so it is left to the ``generate_image_derivatives``
+command rather than done while an upload is saved.
+"""
+import io
+import json
+import logging
+import posixpath
+
+from django.conf import settings
+from django.core.cache import cache
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+from PIL import Image, ImageOps, UnidentifiedImageError
+
+
+logger = logging.getLogger(__name__)
+
+DERIVATIVE_WIDTHS = getattr(settings, 'IMAGE_DERIVATIVE_WIDTHS', [320, 640, 960, 1280])
+# Images without derivatives are rechecked after this many seconds, in case
+# they were generated by a process whose cache writes this one cannot see
+MISSING_DERIVATIVES_TIMEOUT = getattr(settings, 'IMAGE_MISSING_DERIVATIVES_TIMEOUT', 60)
+
+FORMATS = {
+    'jpg': {'format': 'JPEG', 'quality': 82, 'optimize': True, 'progressive': True},
+    'webp': {'format': 'WEBP', 'quality': 80, 'method': 6},
+}
+
+
+def _stem(name):
+    return posixpath.join('derivatives', posixpath.splitext(name)[0])
+
+
+def derivative_name(name, width, ext):
+    return f'{_stem(name)}-{width}w.{ext}'
+
+
+def _sidecar_name(name):
+    return f'{_stem(name)}.json'
+
+
+def _cache_key(name):
+    return f'image-derivatives:{name}'
+
+
+def _save(path, content):
+    if default_storage.exists(path):
+        default_storage.delete(path)
+    default_storage.save(path, ContentFile(content))
+
+
+def generate_derivatives(name):
+    """
+    Write every derivative of the stored image ``name`` and return its metadata.
+
+    Returns None when the file is missing or is not an image Pillow can read.
+    """
+    try:
+        with default_storage.open(name, 'rb') as source:
+            image = Image.open(source)
+            image = ImageOps.exif_transpose(image)
+            image.load()
+    except (OSError, UnidentifiedImageError) as exc:
+        logger.warning('Cannot generate derivatives for %s: %s', name, exc)
+        return None
+
+    if image.mode not in ('RGB', 'L'):
+        image = image.convert('RGB')
+
+    widths = sorted(
+        {width for width in DERIVATIVE_WIDTHS if width < image.width}
+        | {min(image.width, max(DERIVATIVE_WIDTHS))}
+    )
+    variants = []
+    for width in widths:
+        height = round(image.height * width / image.width)
+        resized = image if width == image.width else image.resize((width, height), Image.LANCZOS)
+        for ext, options in FORMATS.items():
+            buffer = io.BytesIO()
+            resized.save(buffer, **options)
+            _save(derivative_name(name, width, ext), buffer.getvalue())
+        variants.append([width, height])
+
+    metadata = {'width': image.width, 'height': image.height, 'variants': variants}
+    _save(_sidecar_name(name), json.dumps(metadata).encode())
+    cache.set(_cache_key(name), metadata, None)
+    return metadata
+
+
+def get_derivatives(name):
+    """Return the metadata of already generated derivatives, or None"""
+    metadata = cache.get(_cache_key(name))
+    if metadata is not None:
+        return metadata or None
+
+    sidecar = _sidecar_name(name)
+    metadata = {}
+    if default_storage.exists(sidecar):
+        with default_storage.open(sidecar, 'rb') as f:
+            metadata = json.loads(f.read())
+    # An empty dict records "no derivatives" so misses are cached too, briefly
+    cache.set(_cache_key(name), metadata, None if metadata else MISSING_DERIVATIVES_TIMEOUT)
+    return metadata or None
+
+
+def get_many_derivatives(names):
+    """Return ``{name: metadata or None}`` for several images with one cache lookup"""
+    cached = cache.get_many([_cache_key(name) for name in names])
+    derivatives = {}
+    for name in names:
+        metadata = cached.get(_cache_key(name))
+        derivatives[name] = get_derivatives(name) if metadata is None else metadata or None
+    return derivatives
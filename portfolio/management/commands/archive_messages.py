@@ -0,0 +1,75 @@
+import time
+from datetime import timedelta
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+
+from portfolio.archive import (
+    ARCHIVE_DIR, RETENTION_DAYS, archive_messages, enable_incremental_vacuum, incremental_vacuum
+)
+
+
+class Command(BaseCommand):
+    help = (
+        'Move contact messages older than the retention period into compressed monthly '
+        'JSON-lines archives and delete them from the database'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--days', type=int, default=RETENTION_DAYS,
+                            help='Archive messages older than this many days')
+        parser.add_argument('--chunk-size', type=int, default=1000,
+                            help='Messages archived and deleted per transaction')
+        parser.add_argument('--vacuum-pages', type=int, default=0,
+                            help='Free pages returned to the file system afterwards, 0 for all')
+        parser.add_argument('--enable-incremental-vacuum', action='store_true',
+                            help='Switch the SQLite database to incremental auto-vacuum first '
+                                 '(runs a full VACUUM once)')
+        parser.add_argument('--loop', action='store_true',
+                            help='Keep running, archiving again every --interval seconds')
+        parser.add_argument('--interval', type=float, default=60 * 60 * 24,
+                            help='Seconds between runs with --loop')
+
+    def handle(self, *args, **options):
+        if options['days'] < 0 or options['chunk_size'] < 1:
+            raise CommandError('--days must not be negative and --chunk-size must be positive')
+        if options['enable_incremental_vacuum']:
+            if connection.vendor != 'sqlite':
+                raise CommandError('Incremental vacuum is only available on SQLite')
+            self.stdout.write('Enabling incremental auto-vacuum, rewriting the database...')
+            enable_incremental_vacuum()
+
+        while True:
+            self.run_once(options)
+            if not options['loop']:
+                break
+            time.sleep(options['interval'])
+
+    def run_once(self, options):
+        started = time.monotonic()
+
+        def progress(moved):
+            if moved % 100000 < options['chunk_size']:
+                self.stdout.write(f'  {moved} messages archived')
+
+        moved = archive_messages(
+            timedelta(days=options['days']), chunk_size=options['chunk_size'], progress=progress
+        )
+        self.stdout.write(self.style.SUCCESS(
+            f'Archived {moved} messages to {ARCHIVE_DIR} in {time.monotonic() - started:.1f}s'
+        ))
+        if not moved:
+            return
+
+        freed = incremental_vacuum(options['vacuum_pages'])
+        if freed is not None:
+            self.stdout.write(f'Incremental vacuum freed {freed} pages')
+        elif connection.vendor == 'sqlite':
+            self.stdout.write(
+                'The database is not in incremental auto-vacuum mode; freed pages are reused but '
+                'the file does not shrink (see --enable-incremental-vacuum)'
+            )
+        if connection.vendor == 'sqlite':
+            # Refresh the planner statistics, and the admin's row estimate, after a large delete
+            with connection.cursor() as cursor:
+                cursor.execute('PRAGMA optimize')
@@ -0,0 +1,189 @@
+import asyncio
+import os
+import statistics
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor
+from io import BytesIO
+from types import ModuleType
+from urllib.parse import urlsplit
+
+from django.core.handlers.asgi import ASGIHandler
+from django.core.handlers.wsgi import WSGIHandler
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.test.utils import override_settings, setup_test_environment, teardown_test_environment
+
+from portfolio import async_views, views
+from portfolio.models import Project
+from portfolio.seeding import seed_dataset
+from portfolio.urls import build_urlpatterns
+
+
+# Each mode gets its own URLconf so the same process can serve both paths
+def urlconf(name, public_views):
+    module = ModuleType(name)
+    module.urlpatterns = build_urlpatterns(public_views)
+    return module
+
+
+URLCONFS = {
+    'wsgi': urlconf('benchmark_wsgi_urls', views),
+    'asgi': urlconf('benchmark_asgi_urls', async_views),
+}
+
+# By default nothing is cached, so every request runs the view itself
+CACHE_BACKENDS = {
+    'none': 'django.core.cache.backends.dummy.DummyCache',
+    'memory': 'django.core.cache.backends.locmem.LocMemCache',
+}
+
+
+class Command(BaseCommand):
+    help = (
+        'Compare requests per second and p99 latency of the public views served '
+        'through the WSGI handler (threads) and the ASGI handler (async views)'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--concurrency', type=int, default=16,
+                            help='Requests in flight at any time, for both handlers')
+        parser.add_argument('--requests', type=int, default=400,
+                            help='Requests sent to each URL per handler')
+        parser.add_argument('--projects', type=int, default=500,
+                            help='Number of projects to seed')
+        parser.add_argument('--cache', choices=sorted(CACHE_BACKENDS), default='none',
+                            help='Cache backend used while benchmarking')
+
+    def handle(self, *args, **options):
+        if options['concurrency'] < 1 or options['requests'] < 1:
+            raise CommandError('--concurrency and --requests must be positive')
+
+        # Worker threads need a real file shared between their connections
+        fd, path = tempfile.mkstemp(suffix='.sqlite3')
+        os.close(fd)
+        connection.settings_dict.setdefault('TEST', {})['NAME'] = path
+        setup_test_environment()
+        caches_override = override_settings(CACHES={
+            'default': {'BACKEND': CACHE_BACKENDS[options['cache']], 'LOCATION': 'benchmark'},
+        })
+        caches_override.enable()
+        old_name = connection.creation.create_test_db(verbosity=0, autoclobber=True, serialize=False)
+        try:
+            seed_dataset(projects=options['projects'])
+            project_id = Project.objects.values_list('id', flat=True).first()
+            urls = [
+                '/',
+                '/about/',
+                '/projects/',
+                f'/projects/{project_id}/',
+                '/api/filter-projects/?tech=tech 1',
+            ]
+            connection.close()
+            results = {mode: self.run_mode(mode, urls, options) for mode in URLCONFS}
+        finally:
+            connection.creation.destroy_test_db(old_name, verbosity=0)
+            caches_override.disable()
+            teardown_test_environment()
+            for suffix in ('', '-wal', '-shm'):
+                if os.path.exists(path + suffix):
+                    os.remove(path + suffix)
+
+        self.stdout.write(f'{"URL":<40} {"mode":<5} {"req/s":>8} {"p50 ms":>8} {"p99 ms":>8}')
+        for url in urls:
+            for mode in URLCONFS:
+                elapsed, latencies, statuses = results[mode][url]
+                quantiles = statistics.quantiles(latencies, n=100)
+                self.stdout.write(
+                    f'{url:<40} {mode:<5} {len(latencies) / elapsed:>8.0f} '
+                    f'{quantiles[49] * 1000:>8.1f} {quantiles[98] * 1000:>8.1f}'
+                )
+                if statuses - {200}:
+                    raise CommandError(f'{mode} {url} answered with status {sorted(statuses)}')
+        self.stdout.write(self.style.SUCCESS('Benchmark complete'))
+
+    def run_mode(self, mode, urls, options):
+        runner = self.run_wsgi if mode == 'wsgi' else self.run_asgi
+        with override_settings(ROOT_URLCONF=URLCONFS[mode]):
+            # One untimed request per URL warms templates and per-process state
+            for url in urls:
+                runner(url, options['concurrency'], options['concurrency'])
+            return {url: runner(url, options['requests'], options['concurrency']) for url in urls}
+
+    def run_wsgi(self, url, count, concurrency):
+        handler = WSGIHandler()
+        path, _, query = url.partition('?')
+
+        def request(_):
+            environ = {
+                'REQUEST_METHOD': 'GET',
+                'PATH_INFO': path,
+                'QUERY_STRING': query,
+                'SERVER_NAME': 'testserver',
+                'SERVER_PORT': '80',
+                'SERVER_PROTOCOL': 'HTTP/1.1',
+                'wsgi.url_scheme': 'http',
+                'wsgi.input': BytesIO(),
+                'wsgi.errors': BytesIO(),
+            }
+            started = time.perf_counter()
+            response = handler(environ, lambda status, headers: None)
+            b''.join(response)
+            response.close()
+            return time.perf_counter() - started, response.status_code
+
+        started = time.perf_counter()
+        with ThreadPoolExecutor(concurrency) as pool:
+            outcomes = list(pool.map(request, range(count)))
+        elapsed = time.perf_counter() - started
+        return elapsed, [latency for latency, _ in outcomes], {status for _, status in outcomes}
+
+    def run_asgi(self, url, count, concurrency):
+        handler = ASGIHandler()
+        parts = urlsplit(url)
+
+        async def request():
+            scope = {
+                'type': 'http',
+                'asgi': {'version': '3.0'},
+                'http_version': '1.1',
+                'method': 'GET',
+                'scheme': 'http',
+                'path': parts.path,
+                'raw_path': parts.path.encode(),
+                'query_string': parts.query.encode(),
+                'headers': [(b'host', b'testserver')],
+                'server': ('testserver', 80),
+                'client': ('127.0.0.1', 0),
+            }
+            received = False
+            status = None
+
+            async def receive():
+                nonlocal received
+                if not received:
+                    received = True
+                    return {'type': 'http.request', 'body': b'', 'more_body': False}
+                # The client never disconnects
+                await asyncio.Future()
+
+            async def send(message):
+                nonlocal status
+                if message['type'] == 'http.response.start':
+                    status = message['status']
+
+            started = time.perf_counter()
+            await handler(scope, receive, send)
+            return time.perf_counter() - started, status
+
+        async def worker(share):
+            return [await request() for _ in range(share)]
+
+        async def run():
+            shares = [count // concurrency + (i < count % concurrency) for i in range(concurrency)]
+            return await asyncio.gather(*(worker(share) for share in shares if share))
+
+        started = time.perf_counter()
+        outcomes = [outcome for batch in asyncio.run(run()) for outcome in batch]
+        elapsed = time.perf_counter() - started
+        return elapsed, [latency for latency, _ in outcomes], {status for _, status in outcomes}
@@ -0,0 +1,174 @@
+import json
+import os
+import platform
+import resource
+import statistics
+import tempfile
+import time
+
+import django
+from django.contrib import admin
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.test import Client
+from django.test.utils import (
+    CaptureQueriesContext, override_settings,
+    setup_test_environment, teardown_test_environment
+)
+from django.urls import reverse
+from django.utils import timezone
+
+from portfolio import urls as portfolio_urls
+from portfolio.models import Project
+from portfolio.seeding import seed_dataset
+from portfolio.management.commands.benchmark_asgi_wsgi import CACHE_BACKENDS
+from portfolio.management.commands.check_query_budget import (
+    EXTRA_QUERIES, METRICS_TOKEN, route_headers, route_kwargs
+)
+
+
+class Command(BaseCommand):
+    help = (
+        'Benchmark every public URL and admin changelist at one or more dataset '
+        'sizes, report throughput, latency percentiles, query counts and peak RSS, '
+        'and optionally fail on regressions against a previous run'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--scales', type=int, nargs='+', default=[10, 1000],
+                            help='Numbers of projects to seed, one run per value (e.g. 10 1000 100000)')
+        parser.add_argument('--requests', type=int, default=50,
+                            help='Timed requests per URL')
+        parser.add_argument('--warmup', type=int, default=3,
+                            help='Untimed requests per URL before measuring')
+        parser.add_argument('--cache', choices=sorted(CACHE_BACKENDS), default='none',
+                            help='Cache backend used while benchmarking')
+        parser.add_argument('--output', help='Write the results to this JSON file')
+        parser.add_argument('--baseline', help='JSON results of a previous run to compare against')
+        parser.add_argument('--tolerance', type=float, default=0.25,
+                            help='Allowed relative p95 slowdown against the baseline')
+
+    def handle(self, *args, **options):
+        if options['requests'] < 1:
+            raise CommandError('--requests must be positive')
+
+        results = []
+        for scale in options['scales']:
+            self.stdout.write(f'Seeding {scale} projects...')
+            results.extend(self.run_scale(scale, options))
+
+        self.stdout.write(
+            f'{"scale":>7} {"URL":<52} {"req/s":>7} {"p50 ms":>8} {"p95 ms":>8} '
+            f'{"p99 ms":>8} {"queries":>7} {"RSS MB":>7}'
+        )
+        for row in results:
+            self.stdout.write(
+                f'{row["scale"]:>7} {row["url"]:<52} {row["rps"]:>7.0f} {row["p50_ms"]:>8.1f} '
+                f'{row["p95_ms"]:>8.1f} {row["p99_ms"]:>8.1f} {row["queries"]:>7} '
+                f'{row["peak_rss_kb"] / 1024:>7.0f}'
+            )
+
+        if options['output']:
+            report = {
+                'created': timezone.now().isoformat(),
+                'python': platform.python_version(),
+                'django': django.get_version(),
+                'requests': options['requests'],
+                'cache': options['cache'],
+                'results': results,
+            }
+            with open(options['output'], 'w') as fp:
+                json.dump(report, fp, indent=2)
+            self.stdout.write(f'Results written to {options["output"]}')
+
+        failures = [f'{row["url"]} answered with status {row["status"]}'
+                    for row in results if row['status'] >= 400]
+        if options['baseline']:
+            failures.extend(self.compare(results, options['baseline'], options['tolerance']))
+        if failures:
+            raise CommandError('Benchmark failed:\n' + '\n'.join(failures))
+        self.stdout.write(self.style.SUCCESS('Benchmark complete'))
+
+    def run_scale(self, scale, options):
+        # A fresh file per scale; Django keeps in-memory test databases alive
+        fd, path = tempfile.mkstemp(suffix='.sqlite3')
+        os.close(fd)
+        connection.settings_dict.setdefault('TEST', {})['NAME'] = path
+        setup_test_environment()
+        caches_override = override_settings(CACHES={
+            'default': {'BACKEND': CACHE_BACKENDS[options['cache']], 'LOCATION': 'benchmark'},
+        }, METRICS_TOKEN=METRICS_TOKEN)
+        caches_override.enable()
+        old_name = connection.creation.create_test_db(verbosity=0, autoclobber=True, serialize=False)
+        try:
+            seed_dataset(projects=scale)
+            return [dict(row, scale=scale) for row in self.run_urls(options)]
+        finally:
+            connection.creation.destroy_test_db(old_name, verbosity=0)
+            caches_override.disable()
+            teardown_test_environment()
+            for suffix in ('', '-wal', '-shm'):
+                if os.path.exists(path + suffix):
+                    os.remove(path + suffix)
+
+    def benchmark_urls(self):
+        """Yield ``(client, url)`` for every public route and admin changelist"""
+        project_id = Project.objects.values_list('id', flat=True).first()
+        for pattern in portfolio_urls.urlpatterns:
+            client = Client(headers=route_headers(pattern.name))
+            url = reverse(pattern.name, kwargs=route_kwargs(pattern, project_id))
+            for query in [''] + EXTRA_QUERIES.get(pattern.name, []):
+                yield client, url + query
+
+        staff = Client()
+        staff.force_login(get_user_model().objects.create_superuser(
+            'benchmark', 'benchmark@example.com', 'benchmark'
+        ))
+        for model in admin.site._registry:
+            opts = model._meta
+            yield staff, reverse(f'admin:{opts.app_label}_{opts.model_name}_changelist')
+
+    def run_urls(self, options):
+        for client, url in self.benchmark_urls():
+            for _ in range(options['warmup']):
+                client.get(url)
+
+            latencies = []
+            with CaptureQueriesContext(connection) as ctx:
+                started = time.perf_counter()
+                for _ in range(options['requests']):
+                    request_started = time.perf_counter()
+                    response = client.get(url)
+                    latencies.append(time.perf_counter() - request_started)
+                elapsed = time.perf_counter() - started
+
+            quantiles = statistics.quantiles(latencies, n=100) if len(latencies) > 1 else latencies * 99
+            yield {
+                'url': url,
+                'status': response.status_code,
+                'rps': len(latencies) / elapsed,
+                'p50_ms': quantiles[49] * 1000,
+                'p95_ms': quantiles[94] * 1000,
+                'p99_ms': quantiles[98] * 1000,
+                'queries': len(ctx.captured_queries) // options['requests'],
+                # Peak resident set size of the process so far, in KB on Linux
+                'peak_rss_kb': resource.getrusage(resource.RUSAGE_SELF).ru_maxrss,
+            }
+
+    def compare(self, results, baseline_path, tolerance):
+        """Return a line for every URL that got slower or runs more queries than in the baseline"""
+        with open(baseline_path) as fp:
+            baseline = {(row['scale'], row['url']): row for row in json.load(fp)['results']}
+
+        failures = []
+        for row in results:
+            previous = baseline.get((row['scale'], row['url']))
+            if previous is None:
+                continue
+            label = f'{row["url"]} at {row["scale"]} projects'
+            if row['queries'] > previous['queries']:
+                failures.append(f'{label}: {row["queries"]} queries, was {previous["queries"]}')
+            if row['p95_ms'] > previous['p95_ms'] * (1 + tolerance):
+                failures.append(f'{label}: p95 {row["p95_ms"]:.1f}ms, was {previous["p95_ms"]:.1f}ms')
+        return failures
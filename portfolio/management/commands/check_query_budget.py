@@ -0,0 +1,143 @@
+from contextlib import contextmanager
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.test import Client
+from django.test.utils import (
+    CaptureQueriesContext, override_settings,
+    setup_test_environment, teardown_test_environment
+)
+from django.urls import reverse
+
+from portfolio import urls as portfolio_urls
+from portfolio.models import Project
+from portfolio.seeding import seed_dataset
+from portfolio.cache import get_content_version
+from portfolio.snapshot import get_snapshot
+from portfolio.tech_index import get_index
+
+
+# Maximum number of queries each URL may run, independent of dataset size.
+# Every route in portfolio/urls.py must have an entry here.
+QUERY_BUDGETS = {
+    'home': 2,
+    'about': 0,
+    'projects': 2,
+    'project_detail': 2,
+    'contact': 1,
+    'filter_projects': 2,
+    'project_index': 0,
+    'search': 1,
+    'search_api': 1,
+    'metrics': 0,
+}
+
+# A private cache keeps the seeded test data out of the shared page cache.
+# Each URL is requested once, so budgets measure the uncached cost of the
+# view, after the per-process content version, content snapshot and
+# technology index are warm.
+ISOLATED_CACHE = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        'LOCATION': 'check-query-budget',
+    }
+}
+
+# /metrics answers 404 without the bearer token, so the check configures one.
+METRICS_TOKEN = 'check-query-budget'
+
+# Extra query strings exercised for routes that take filters.
+EXTRA_QUERIES = {
+    'projects': ['?tech=tech 1', '?tech=tech 1,tech 2&mode=all'],
+    'filter_projects': ['?tech=tech 1', '?tech=tech 1,tech 2&mode=all', '?ids=3,1,2', '?ids=3,1,2&cards=1'],
+    'search': ['?q=synthetic project', '?q=proj&offset=12'],
+    'search_api': ['?q=synthetic project', '?q=proj&offset=12'],
+}
+
+
+def route_kwargs(pattern, project_id):
+    """URL kwargs for reversing ``pattern`` against the seeded data"""
+    kwargs = {}
+    if 'project_id' in pattern.pattern.converters:
+        kwargs['project_id'] = project_id
+    if 'version' in pattern.pattern.converters:
+        kwargs['version'] = get_content_version()[0]
+    return kwargs
+
+
+@contextmanager
+def test_database(current=False):
+    """
+    Run the block against a new, migrated test database that is dropped
+    afterwards, or against the current database when ``current`` is set,
+    e.g. from a test case that already runs on one.
+    """
+    if current:
+        yield
+        return
+    setup_test_environment()
+    old_name = connection.creation.create_test_db(verbosity=0, autoclobber=True, serialize=False)
+    try:
+        yield
+    finally:
+        connection.creation.destroy_test_db(old_name, verbosity=0)
+        teardown_test_environment()
+
+
+def route_headers(name):
+    """Request headers the checks send to the route ``name``"""
+    if name == 'metrics':
+        return {'authorization': f'Bearer {METRICS_TOKEN}'}
+    return {}
+
+
+class Command(BaseCommand):
+    help = 'Fail when any public URL exceeds its query budget on a large seeded dataset'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--projects', type=int, default=500,
+                            help='Number of projects to seed')
+        parser.add_argument('--technologies', type=int, default=30,
+                            help='Number of technologies to seed')
+        parser.add_argument('--current-database', action='store_true',
+                            help='Seed the current database instead of a throwaway test database')
+
+    def handle(self, *args, **options):
+        with override_settings(CACHES=ISOLATED_CACHE, METRICS_TOKEN=METRICS_TOKEN):
+            with test_database(options['current_database']):
+                seed_dataset(projects=options['projects'], technologies=options['technologies'])
+                failures = self.check_budgets()
+
+        if failures:
+            raise CommandError('Query budget exceeded:\n' + '\n'.join(failures))
+        self.stdout.write(self.style.SUCCESS('All URLs are within their query budgets'))
+
+    def check_budgets(self):
+        client = Client()
+        get_content_version()
+        get_snapshot()
+        get_index()
+        project_id = Project.objects.values_list('id', flat=True).first()
+        failures = []
+
+        for pattern in portfolio_urls.urlpatterns:
+            name = pattern.name
+            if name not in QUERY_BUDGETS:
+                failures.append(f'{name}: no query budget defined')
+                continue
+
+            url = reverse(name, kwargs=route_kwargs(pattern, project_id))
+
+            for query in [''] + EXTRA_QUERIES.get(name, []):
+                with CaptureQueriesContext(connection) as ctx:
+                    response = client.get(url + query, headers=route_headers(name))
+                count = len(ctx.captured_queries)
+                budget = QUERY_BUDGETS[name]
+                line = f'{url + query}: {count} queries (budget {budget}, status {response.status_code})'
+                if count > budget or response.status_code >= 400:
+                    failures.append(line)
+                    self.stdout.write(self.style.ERROR(line))
+                else:
+                    self.stdout.write(line)
+
+        return failures
@@ -0,0 +1,141 @@
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.test import Client
+from django.test.utils import CaptureQueriesContext, override_settings
+from django.urls import reverse
+
+from portfolio import urls as portfolio_urls
+from portfolio.changelist import encode_cursor as encode_message_cursor
+from portfolio.models import ContactMessage, Project
+from portfolio.seeding import seed_dataset
+from portfolio.cache import get_content_version
+from portfolio.tech_index import get_index
+from portfolio.management.commands.check_query_budget import (
+    EXTRA_QUERIES, ISOLATED_CACHE, METRICS_TOKEN, route_headers, route_kwargs, test_database
+)
+
+
+# Admin changelists checked in addition to every public route
+ADMIN_URLS = {
+    'admin:portfolio_contactmessage_changelist': [
+        '', '?is_read__exact=0', '?is_read__exact=1', '?q=sender12', '?is_read__exact=0&q=sender12',
+    ],
+}
+
+# Plan steps expected on some routes; any other full scan or temporary
+# B-tree sort fails the check.
+ALLOWED_STEPS = {
+    # Portfolio holds the single site profile row; capped counts read the
+    # LIMITed subquery whose own plan is checked as well
+    '*': ['SCAN portfolio_portfolio', 'SCAN subquery'],
+}
+
+# Full-text matches (any URL with ?q=) are sorted after the index lookup,
+# by BM25 rank on the public search and by date in the admin
+SEARCH_STEPS = ['USE TEMP B-TREE FOR ORDER BY']
+
+
+def plan_problems(steps):
+    """Yield the steps of a query plan that scan a whole table or sort in a temporary B-tree"""
+    for step in steps:
+        if 'TEMP B-TREE' in step:
+            yield step
+        elif (step.startswith('SCAN ') and ' USING ' not in step
+              and 'VIRTUAL TABLE' not in step and step != 'SCAN CONSTANT ROW'):
+            yield step
+
+
+class Command(BaseCommand):
+    help = (
+        'Run EXPLAIN QUERY PLAN on every query of the public views on a large seeded '
+        'dataset and fail on full table scans or temporary B-tree sorts'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--projects', type=int, default=5000,
+                            help='Number of projects to seed')
+        parser.add_argument('--messages', type=int, default=5000,
+                            help='Number of contact messages to seed')
+        parser.add_argument('--current-database', action='store_true',
+                            help='Seed the current database instead of a throwaway test database')
+
+    def handle(self, *args, **options):
+        if connection.vendor != 'sqlite':
+            raise CommandError('Query plans are checked against SQLite only')
+
+        with override_settings(CACHES=ISOLATED_CACHE, METRICS_TOKEN=METRICS_TOKEN):
+            with test_database(options['current_database']):
+                seed_dataset(projects=options['projects'], messages=options['messages'])
+                with connection.cursor() as cursor:
+                    # Give the planner realistic statistics, as a long-lived database would have
+                    cursor.execute('ANALYZE')
+                failures = self.check_plans()
+
+        if failures:
+            raise CommandError('Query plans need attention:\n' + '\n'.join(failures))
+        self.stdout.write(self.style.SUCCESS('No full table scans or temporary sorts'))
+
+    def urls(self):
+        """Yield ``(route name, client, url)`` for every checked request"""
+        anonymous = Client()
+        project_id = Project.objects.values_list('id', flat=True).first()
+        for pattern in portfolio_urls.urlpatterns:
+            client = Client(headers=route_headers(pattern.name))
+            url = reverse(pattern.name, kwargs=route_kwargs(pattern, project_id))
+            for query in [''] + EXTRA_QUERIES.get(pattern.name, []):
+                yield pattern.name, client, url + query
+
+        # A second keyset page exercises the cursor filter
+        cursor = anonymous.get(reverse('filter_projects')).json()['next']
+        yield 'filter_projects', anonymous, f'{reverse("filter_projects")}?cursor={cursor}'
+        yield 'projects', anonymous, f'{reverse("projects")}?cursor={cursor}'
+
+        staff = Client()
+        staff.force_login(get_user_model().objects.create_superuser(
+            'plans', 'plans@example.com', 'plans'
+        ))
+        for name, queries in ADMIN_URLS.items():
+            for query in queries:
+                yield name, staff, reverse(name) + query
+
+        # A deep keyset page of the message changelist
+        message = ContactMessage.objects.order_by('-created_at', '-id')[1000]
+        name = 'admin:portfolio_contactmessage_changelist'
+        for query in ['', '&is_read__exact=0']:
+            yield name, staff, f'{reverse(name)}?cursor={encode_message_cursor(message)}{query}'
+
+    def check_plans(self):
+        get_content_version()
+        get_index()
+        failures = []
+
+        for name, client, url in self.urls():
+            with CaptureQueriesContext(connection) as ctx:
+                response = client.get(url)
+            if response.status_code >= 400:
+                failures.append(f'{url}: status {response.status_code}')
+
+            allowed = ALLOWED_STEPS['*'] + ALLOWED_STEPS.get(name, [])
+            if 'q=' in url:
+                allowed = allowed + SEARCH_STEPS
+            problems = []
+            for query in ctx.captured_queries:
+                sql = query['sql']
+                if not sql.lstrip().upper().startswith('SELECT'):
+                    continue
+                with connection.cursor() as cursor:
+                    cursor.execute('EXPLAIN QUERY PLAN ' + sql)
+                    steps = [row[3] for row in cursor.fetchall()]
+                for step in plan_problems(steps):
+                    if not any(step.startswith(prefix) for prefix in allowed):
+                        problems.append(f'  {step}\n    in {sql[:300]}')
+
+            line = f'{url}: {len(ctx.captured_queries)} queries, {len(problems)} plan problems'
+            if problems:
+                failures.append(line + '\n' + '\n'.join(problems))
+                self.stdout.write(self.style.ERROR(line))
+            else:
+                self.stdout.write(line)
+
+        return failures
@@ -0,0 +1,40 @@
+import gzip
+import sys
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+
+from portfolio.transfer import dumps, export_records
+
+
+class Command(BaseCommand):
+    help = (
+        'Stream the portfolio content (profile, skills, technologies, projects, certificates '
+        'and recommendations) to a JSON-lines file for import_portfolio'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('output', help='File to write, "-" for standard output; a .gz name is compressed')
+        parser.add_argument('--batch-size', type=int, default=1000,
+                            help='Rows read per query')
+
+    def handle(self, *args, **options):
+        if options['batch_size'] < 1:
+            raise CommandError('--batch-size must be positive')
+        output = options['output']
+        started = time.monotonic()
+        if output == '-':
+            count = self.write(sys.stdout, options['batch_size'])
+        else:
+            opener = gzip.open if output.endswith('.gz') else open
+            with opener(output, 'wt', encoding='utf-8') as f:
+                count = self.write(f, options['batch_size'])
+            self.stderr.write(self.style.SUCCESS(
+                f'Exported {count} records to {output} in {time.monotonic() - started:.1f}s'
+            ))
+
+    def write(self, f, batch_size):
+        for record in export_records(batch_size):
+            f.write(dumps(record) + '\n')
+        # The last record is the trailer holding the record count
+        return record['records']
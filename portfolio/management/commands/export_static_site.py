@@ -0,0 +1,211 @@
+import hashlib
+import json
+import os
+from pathlib import Path
+
+from django.conf import settings
+from django.contrib.staticfiles.finders import get_finders
+from django.contrib.staticfiles.storage import HashedFilesMixin, staticfiles_storage
+from django.core.management.base import BaseCommand, CommandError
+from django.template.loader import render_to_string
+from django.test import Client, RequestFactory, override_settings
+from django.utils.http import urlencode
+from django.utils.text import slugify
+
+from portfolio.cache import get_content_version
+from portfolio.compression import ENCODING_SUFFIXES, is_compressible, write_compressed_variants
+from portfolio.images import get_many_derivatives
+from portfolio.models import Portfolio, Project, Technology
+from portfolio.views import projects_context
+
+
+MANIFEST_NAME = '.export-manifest.json'
+
+
+class Command(BaseCommand):
+    help = 'Export the public site to a static HTML tree with pre-compressed siblings'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--output', default=str(settings.BASE_DIR / 'site'),
+                            help='Directory to write the site to')
+        parser.add_argument('--full', action='store_true',
+                            help='Ignore the previous export and rewrite every file')
+
+    def handle(self, *args, **options):
+        self.output = Path(options['output'])
+        self.output.mkdir(parents=True, exist_ok=True)
+        manifest_path = self.output / MANIFEST_NAME
+
+        self.previous = {}
+        if manifest_path.exists() and not options['full']:
+            self.previous = json.loads(manifest_path.read_text())
+        self.current = {}
+        self.written = 0
+
+        # Each page is signed with the state of the rows it shows, so pages
+        # unchanged since the previous export are not even rendered. The rest
+        # render through the normal views in export mode, which drops the
+        # links a file server cannot answer and skips the page cache.
+        self.static_version = self.get_static_version()
+        self.client = Client(HTTP_HOST=self.export_host())
+        with override_settings(STATIC_EXPORT=True):
+            for url, relpath, state in self.pages():
+                self.export_page(url, relpath, state)
+            self.export_projects_page()
+        self.export_static()
+        self.export_media()
+
+        removed = 0
+        for relpath in set(self.previous) - set(self.current):
+            target = self.output / relpath
+            for path in [target] + [Path(f'{target}{suffix}') for suffix in ENCODING_SUFFIXES.values()]:
+                if path.exists():
+                    path.unlink()
+            removed += 1
+
+        manifest_path.write_text(json.dumps(self.current, indent=0, sort_keys=True))
+        self.stdout.write(self.style.SUCCESS(
+            f'Exported {len(self.current)} files to {self.output}: '
+            f'{self.written} written, {removed} removed'
+        ))
+
+    def export_host(self):
+        for host in settings.ALLOWED_HOSTS:
+            host = host.lstrip('.')
+            if host and host != '*':
+                return host
+        return 'localhost'
+
+    def pages(self):
+        """
+        Yield ``(url, relpath, state)`` for every exported page.
+
+        ``state`` covers the rows the page shows. A project page depends on its
+        project, technologies and image derivatives and on the profile, so an
+        edit only renders the pages showing the edited rows again. Pages
+        listing many rows use the content version, which every edit bumps.
+        """
+        version = get_content_version()[0]
+        yield '/', 'index.html', version
+        yield '/about/', 'about/index.html', version
+
+        profile = Portfolio.objects.values_list('updated_at', flat=True).first()
+        projects = Project.objects.prefetch_related('technologies').order_by('id')
+        for project in projects.iterator(chunk_size=500):
+            technologies = [(tech.pk, tech.name, tech.color) for tech in project.technologies.all()]
+            derivatives = get_many_derivatives([project.image.name]) if project.image else None
+            state = (profile, project.updated_at, technologies, derivatives)
+            yield f'/projects/{project.pk}/', f'projects/{project.pk}/index.html', state
+
+        yield f'/api/project-index/{version}.json', f'api/project-index/{version}.json', version
+        yield '/api/filter-projects/?stream=1', 'api/filter-projects/index.json', version
+        slugs = set()
+        for tech_id, name in Technology.objects.order_by('name').values_list('id', 'name'):
+            slug = slugify(name) or 'technology'
+            if slug in slugs:
+                slug = f'{slug}-{tech_id}'
+            slugs.add(slug)
+            query = urlencode({'stream': 1, 'tech': name})
+            yield f'/api/filter-projects/?{query}', f'api/filter-projects/{slug}.json', version
+
+    def get_static_version(self):
+        """Digest of the hashed static names pages reference, if any"""
+        if settings.DEBUG or not isinstance(staticfiles_storage, HashedFilesMixin):
+            return ''
+        manifest = Path(settings.STATIC_ROOT) / staticfiles_storage.manifest_name
+        if not manifest.is_file():
+            return ''
+        return hashlib.sha256(manifest.read_bytes()).hexdigest()[:16]
+
+    def render_signature(self, state):
+        # Taken before rendering, so an edit made meanwhile is picked up next time
+        digest = hashlib.md5(repr(state).encode()).hexdigest()
+        return f'rows:{digest}:{self.static_version}'
+
+    def export_page(self, url, relpath, state):
+        signature = self.render_signature(state)
+        if self.is_current(relpath, signature):
+            self.current[relpath] = signature
+            return
+        response = self.client.get(url)
+        if response.status_code != 200:
+            raise CommandError(f'{url} returned {response.status_code}')
+        content = b''.join(response.streaming_content) if response.streaming else response.content
+        self.write(relpath, content, signature)
+
+    def export_projects_page(self):
+        """
+        Render the projects page with every project. A file server cannot
+        answer the cursor and ``?ids=`` API calls behind "Load more", so the
+        exported page needs none of them; filters run on the exported index.
+        """
+        relpath = 'projects/index.html'
+        signature = self.render_signature(get_content_version()[0])
+        if self.is_current(relpath, signature):
+            self.current[relpath] = signature
+            return
+        request = RequestFactory(HTTP_HOST=self.export_host()).get('/projects/')
+        projects = list(Project.objects.prefetch_related('technologies').order_by('order', '-created_at', 'id'))
+        content = render_to_string(
+            'portfolio/projects.html', projects_context(request, projects, None), request=request,
+        ).encode()
+        self.write(relpath, content, signature)
+
+    def export_static(self):
+        # Without DEBUG the manifest storage makes pages reference the hashed
+        # names, which only exist in STATIC_ROOT after collectstatic
+        if not settings.DEBUG and isinstance(staticfiles_storage, HashedFilesMixin):
+            self.export_collected_static()
+            return
+        seen = set()
+        for finder in get_finders():
+            for path, storage in finder.list([]):
+                prefix = getattr(storage, 'prefix', None) or ''
+                relpath = os.path.join(prefix, path)
+                if relpath in seen:
+                    continue
+                seen.add(relpath)
+                self.copy(storage.path(path), Path(settings.STATIC_URL.strip('/')) / relpath)
+
+    def export_collected_static(self):
+        static_root = Path(settings.STATIC_ROOT)
+        if not (static_root / staticfiles_storage.manifest_name).is_file():
+            raise CommandError('No staticfiles manifest in STATIC_ROOT: run collectstatic first')
+        static_prefix = Path(settings.STATIC_URL.strip('/'))
+        suffixes = tuple(ENCODING_SUFFIXES.values())
+        for source in static_root.rglob('*'):
+            # Compressed siblings are written again next to each copy
+            if source.is_file() and not source.name.endswith(suffixes):
+                self.copy(source, static_prefix / source.relative_to(static_root))
+
+    def export_media(self):
+        media_root = Path(settings.MEDIA_ROOT)
+        if not media_root.is_dir():
+            return
+        media_prefix = Path(settings.MEDIA_URL.strip('/'))
+        for source in media_root.rglob('*'):
+            if source.is_file():
+                self.copy(source, media_prefix / source.relative_to(media_root))
+
+    def copy(self, source, relpath):
+        stat = os.stat(source)
+        signature = f'{stat.st_size}:{stat.st_mtime_ns}'
+        if self.is_current(str(relpath), signature):
+            self.current[str(relpath)] = signature
+        else:
+            self.write(relpath, Path(source).read_bytes(), signature)
+
+    def is_current(self, relpath, signature):
+        return self.previous.get(relpath) == signature and (self.output / relpath).exists()
+
+    def write(self, relpath, content, signature):
+        relpath = str(relpath)
+        self.current[relpath] = signature
+        if self.is_current(relpath, signature):
+            return
+        target = self.output / relpath
+        target.parent.mkdir(parents=True, exist_ok=True)
+        target.write_bytes(content)
+        if is_compressible(target):
+            write_compressed_variants(target, content)
+        self.written += 1
@@ -0,0 +1,62 @@
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+
+from portfolio.cache import bump_content_version, invalidate_pages
+from portfolio.seeding import seed_dataset
+
+
+class Command(BaseCommand):
+    help = (
+        'Bulk insert a synthetic dataset of any size into the configured database, '
+        'for benchmarking and capacity planning'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--projects', type=int, default=1000,
+                            help='Number of projects to create')
+        parser.add_argument('--technologies', type=int, default=30,
+                            help='Number of technologies to create')
+        parser.add_argument('--techs-per-project', type=int, default=5,
+                            help='Technologies linked to each project')
+        parser.add_argument('--messages', type=int, default=0,
+                            help='Number of contact messages to create')
+        parser.add_argument('--skills', type=int, default=40,
+                            help='Number of skills to create')
+        parser.add_argument('--seed', type=int, default=0,
+                            help='Random seed, the same seed produces the same dataset')
+        parser.add_argument('--batch-size', type=int, default=2000,
+                            help='Rows generated and inserted per batch')
+
+    def handle(self, *args, **options):
+        if min(options['projects'], options['technologies'], options['messages'],
+               options['skills']) < 0 or options['batch_size'] < 1:
+            raise CommandError('Counts must not be negative and --batch-size must be positive')
+
+        reported = {}
+
+        def progress(name, count):
+            # Report roughly every 100k rows
+            if count // 100000 > reported.get(name, 0) // 100000:
+                self.stdout.write(f'  {count} {name}')
+            reported[name] = count
+
+        started = time.monotonic()
+        seed_dataset(
+            projects=options['projects'],
+            technologies=options['technologies'],
+            skills=options['skills'],
+            messages=options['messages'],
+            techs_per_project=options['techs_per_project'],
+            batch_size=options['batch_size'],
+            seed=options['seed'],
+            progress=progress,
+        )
+        # bulk_create sends no model signals, so invalidate the cached pages here
+        invalidate_pages('home', 'about', 'projects', 'project_detail')
+        bump_content_version()
+
+        self.stdout.write(self.style.SUCCESS(
+            f'Created {options["projects"]} projects, {options["technologies"]} technologies and '
+            f'{options["messages"]} messages in {time.monotonic() - started:.1f}s'
+        ))
@@ -0,0 +1,102 @@
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+import django
+from django.core.management.base import BaseCommand
+from django.db import connections
+
+from portfolio.cache import bump_content_version, invalidate_pages
+from portfolio.images import generate_derivatives, get_derivatives
+from portfolio.models import Portfolio, Project
+
+
+def _init_worker():
+    # Needed where workers are spawned rather than forked
+    django.setup()
+
+
+class Command(BaseCommand):
+    help = (
+        'Generate resized JPEG/WebP derivatives for every project and profile image; '
+        'with --watch, keep generating them for new uploads'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--workers', type=int, default=os.cpu_count(),
+                            help='Number of worker processes')
+        parser.add_argument('--force', action='store_true',
+                            help='Regenerate derivatives that already exist')
+        parser.add_argument('--watch', action='store_true',
+                            help='Keep running and pick up images uploaded since the last round')
+        parser.add_argument('--interval', type=float, default=10.0,
+                            help='Seconds to sleep between rounds with --watch')
+
+    def handle(self, *args, **options):
+        if not options['watch']:
+            names = self.pending_images(options['force'])
+            if names:
+                self.generate(names, options['workers'])
+            else:
+                self.stdout.write('All derivatives are up to date')
+            return
+
+        # Unreadable images are reported once rather than every round
+        skipped = set()
+        while True:
+            try:
+                names = self.pending_images(force=False) - skipped
+                if names:
+                    skipped.update(self.generate(names, options['workers']))
+            except Exception as exc:
+                # e.g. the media storage is unreachable; try again next round
+                self.stderr.write(f'Derivative generation failed: {exc}')
+            time.sleep(options['interval'])
+
+    def pending_images(self, force):
+        """Return the stored image names that still need derivatives"""
+        names = set(Project.objects.exclude(image='').values_list('image', flat=True))
+        names.update(
+            Portfolio.objects.exclude(profile_image='').exclude(profile_image=None)
+            .values_list('profile_image', flat=True)
+        )
+        if not force:
+            names = {name for name in names if get_derivatives(name) is None}
+        return names
+
+    def generate(self, names, workers):
+        """Generate the derivatives of ``names``, returning the images that were skipped"""
+        # Workers only touch storage and the cache, never the database
+        connections.close_all()
+
+        generated, skipped = [], []
+        with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker) as pool:
+            futures = {pool.submit(generate_derivatives, name): name for name in sorted(names)}
+            for future in as_completed(futures):
+                name = futures[future]
+                if future.result() is None:
+                    skipped.append(name)
+                    self.stdout.write(self.style.WARNING(f'Skipped {name}'))
+                else:
+                    generated.append(name)
+                    self.stdout.write(f'Generated derivatives for {name}')
+
+        if generated:
+            self.refresh_pages(generated)
+
+        self.stdout.write(
+            self.style.SUCCESS(f'Processed {len(generated)} images, skipped {len(skipped)}')
+        )
+        return skipped
+
+    def refresh_pages(self, names):
+        """Invalidate the cached pages showing the given images, so they switch to the derivatives"""
+        pages = set()
+        project_ids = Project.objects.filter(image__in=names).values_list('pk', flat=True)
+        for pk in project_ids:
+            pages.update(['home', 'projects', f'project_detail:{pk}'])
+        if Portfolio.objects.filter(profile_image__in=names).exists():
+            pages.update(['home', 'about'])
+        invalidate_pages(*pages)
+        # A new content version also changes the ETag, so browsers stop reusing old copies
+        bump_content_version()
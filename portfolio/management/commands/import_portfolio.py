@@ -0,0 +1,57 @@
+import gzip
+import sys
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+
+from portfolio.cache import bump_content_version, invalidate_pages
+from portfolio.search import rebuild_index
+from portfolio.transfer import InvalidExport, import_records
+
+
+class Command(BaseCommand):
+    help = (
+        'Upsert the portfolio content from an export_portfolio file in batches; '
+        'records are matched by id, technologies by name'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('input', help='File to read, "-" for standard input; .gz files are decompressed')
+        parser.add_argument('--batch-size', type=int, default=1000,
+                            help='Records upserted per query')
+
+    def handle(self, *args, **options):
+        if options['batch_size'] < 1:
+            raise CommandError('--batch-size must be positive')
+        source = options['input']
+
+        reported = {}
+
+        def progress(type_name, count):
+            # Report roughly every 100k records
+            if count // 100000 > reported.get(type_name, 0) // 100000:
+                self.stdout.write(f'  {count} {type_name} records')
+            reported[type_name] = count
+
+        started = time.monotonic()
+        try:
+            if source == '-':
+                counts = import_records(sys.stdin, options['batch_size'], progress)
+            else:
+                opener = gzip.open if source.endswith('.gz') else open
+                with opener(source, 'rt', encoding='utf-8') as f:
+                    counts = import_records(f, options['batch_size'], progress)
+        except (InvalidExport, OSError) as exc:
+            raise CommandError(f'Nothing imported: {exc}')
+
+        # bulk_create sends no model signals: refresh what they would have
+        rebuild_index()
+        invalidate_pages('home', 'about', 'projects', 'project_detail', 'search')
+        bump_content_version()
+
+        summary = ', '.join(f'{count} {type_name}' for type_name, count in counts.items()) or 'nothing'
+        self.stdout.write(self.style.SUCCESS(
+            f'Imported {summary} in {time.monotonic() - started:.1f}s'
+        ))
+        if counts.get('project') or counts.get('portfolio'):
+            self.stdout.write('Run generate_image_derivatives if the imported images are new')
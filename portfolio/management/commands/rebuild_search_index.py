@@ -0,0 +1,23 @@
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+
+from portfolio.cache import invalidate_pages
+from portfolio.search import (
+    MESSAGE_SEARCH_TABLE, SEARCH_TABLE, is_available, rebuild_index, rebuild_message_index
+)
+
+
+class Command(BaseCommand):
+    help = (
+        'Rebuild the full-text search index from the projects, certificates and recommendations, '
+        'and the contact message index used by the admin'
+    )
+
+    def handle(self, *args, **options):
+        if not is_available():
+            raise CommandError('Full-text search requires SQLite with FTS5')
+        with transaction.atomic():
+            rebuild_index()
+            rebuild_message_index()
+        invalidate_pages('search')
+        self.stdout.write(self.style.SUCCESS(f'Rebuilt {SEARCH_TABLE} and {MESSAGE_SEARCH_TABLE}'))
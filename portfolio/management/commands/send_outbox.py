@@ -0,0 +1,48 @@
+import time
+
+from django.core.mail import get_connection
+from django.core.management.base import BaseCommand
+
+from portfolio.outbox import send_batch
+
+
+class Command(BaseCommand):
+    help = 'Send queued contact-form notifications in batches over one reused connection'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=50,
+                            help='Number of notifications sent per batch')
+        parser.add_argument('--interval', type=float, default=5.0,
+                            help='Seconds to sleep when nothing is due')
+        parser.add_argument('--once', action='store_true',
+                            help='Drain the due notifications and exit')
+
+    def handle(self, *args, **options):
+        while True:
+            try:
+                sent, failed = self.drain(options['batch_size'])
+            except Exception as exc:
+                # e.g. the mail server is unreachable; try again next round
+                self.stderr.write(f'Outbox delivery failed: {exc}')
+                sent = failed = 0
+            if sent or failed:
+                self.stdout.write(f'Sent {sent} notifications, {failed} failed')
+            if options['once']:
+                break
+            time.sleep(options['interval'])
+
+    def drain(self, batch_size):
+        """Send every due notification, keeping the connection open between batches"""
+        total_sent = total_failed = 0
+        connection = get_connection(fail_silently=False)
+        connection.open()
+        try:
+            while True:
+                sent, failed = send_batch(connection, batch_size)
+                total_sent += sent
+                total_failed += failed
+                if sent + failed < batch_size:
+                    break
+        finally:
+            connection.close()
+        return total_sent, total_failed
@@ -0,0 +1,152 @@
+import os
+import statistics
+import tempfile
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import django
+from django.core.management.base import BaseCommand, CommandError
+from django.db import OperationalError, connection, connections
+
+from portfolio.management.commands.check_query_budget import test_database
+from portfolio.models import ContactMessage
+from portfolio.write_queue import ContactWriteQueue, save_contact_message
+
+
+def _init_worker(path):
+    # Needed where workers are spawned rather than forked
+    django.setup()
+    connections['default'].settings_dict['NAME'] = path
+
+
+def run_writers(threads, rate, duration, coalesce, prefix=''):
+    """
+    Write contact messages from ``threads`` threads at ``rate`` writes per second.
+
+    Returns ``(latencies, errors)``, the errors as strings so they can be
+    sent back from a worker process.
+    """
+    write_queue = ContactWriteQueue() if coalesce else None
+    interval = threads / rate
+    deadline = time.monotonic() + duration
+    latencies, errors = [], []
+    lock = threading.Lock()
+
+    def write(n):
+        message = ContactMessage(name=f'Stress {n}', email='stress@example.com',
+                                 message=f'Message {n}')
+        if write_queue is not None:
+            write_queue.submit(message)
+        else:
+            save_contact_message(message)
+
+    def writer(worker):
+        n = 0
+        next_at = time.monotonic()
+        try:
+            while next_at < deadline:
+                time.sleep(max(0, next_at - time.monotonic()))
+                started = time.monotonic()
+                try:
+                    write(f'{prefix}{worker}-{n}')
+                except OperationalError as exc:
+                    with lock:
+                        errors.append(str(exc))
+                else:
+                    with lock:
+                        latencies.append(time.monotonic() - started)
+                n += 1
+                next_at += interval
+        finally:
+            connection.close()
+
+    workers = [threading.Thread(target=writer, args=(i,)) for i in range(threads)]
+    for worker in workers:
+        worker.start()
+    for worker in workers:
+        worker.join()
+    return latencies, errors
+
+
+class Command(BaseCommand):
+    help = (
+        'Hammer a throwaway file-backed SQLite database with concurrent contact-form '
+        'writes and fail if any of them hits "database is locked"'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--threads', type=int, default=16,
+                            help='Number of concurrent writers in each process')
+        parser.add_argument('--processes', type=int, default=1,
+                            help='Number of writer processes, like web server workers')
+        parser.add_argument('--rate', type=float, default=200,
+                            help='Target writes per second across all writers')
+        parser.add_argument('--duration', type=float, default=5,
+                            help='Seconds to run for')
+        parser.add_argument('--coalesce', action='store_true',
+                            help='Route writes through the batching write queue')
+        parser.add_argument('--current-database', action='store_true',
+                            help='Write to the current database file instead of a throwaway one')
+
+    def handle(self, *args, **options):
+        if connection.vendor != 'sqlite':
+            raise CommandError('This stress test targets SQLite only')
+
+        if options['current_database']:
+            if connection.is_in_memory_db():
+                raise CommandError('The current database must be a file shared by the writers')
+            results = self.measure(str(connection.settings_dict['NAME']), options)
+        else:
+            # Writers need a real file shared between their connections
+            fd, path = tempfile.mkstemp(suffix='.sqlite3')
+            os.close(fd)
+            connection.settings_dict.setdefault('TEST', {})['NAME'] = path
+            try:
+                with test_database():
+                    results = self.measure(path, options)
+            finally:
+                for suffix in ('', '-wal', '-shm'):
+                    if os.path.exists(path + suffix):
+                        os.remove(path + suffix)
+
+        latencies, errors, elapsed, committed = results
+        self.stdout.write(
+            f'{committed} writes in {elapsed:.2f}s ({committed / elapsed:.0f}/s), '
+            f'{len(errors)} errors'
+        )
+        if latencies:
+            quantiles = statistics.quantiles(latencies, n=100)
+            self.stdout.write(
+                f'latency p50 {quantiles[49] * 1000:.1f}ms, p99 {quantiles[98] * 1000:.1f}ms'
+            )
+        if errors:
+            raise CommandError(f'{len(errors)} writes failed, first error: {errors[0]}')
+        self.stdout.write(self.style.SUCCESS('No lock errors'))
+
+    def measure(self, path, options):
+        """Run the writers, returning ``(latencies, errors, elapsed, committed)``"""
+        existing = ContactMessage.objects.count()
+        started = time.monotonic()
+        latencies, errors = self.run(path, options)
+        elapsed = time.monotonic() - started
+        return latencies, errors, elapsed, ContactMessage.objects.count() - existing
+
+    def run(self, path, options):
+        processes = options['processes']
+        args = (options['threads'], options['rate'] / processes,
+                options['duration'], options['coalesce'])
+        if processes == 1:
+            return run_writers(*args)
+
+        # Workers open their own connections to the database file
+        connections.close_all()
+        latencies, errors = [], []
+        with ProcessPoolExecutor(max_workers=processes, initializer=_init_worker,
+                                 initargs=(path,)) as pool:
+            futures = [pool.submit(run_writers, *args, prefix=f'p{i}-') for i in range(processes)]
+            for future in futures:
+                worker_latencies, worker_errors = future.result()
+                latencies.extend(worker_latencies)
+                errors.extend(worker_errors)
+        return latencies, errors
@@ -0,0 +1,181 @@
+"""
+Per-request timings and per-route histograms.
+
+ServerTimingMiddleware (middleware.py) opens a RequestTiming for each
+request in a context variable. Database queries, template rendering and the
+page cache add their figures to it, and the middleware reports them in a
+Server-Timing header and feeds them into the histograms exposed at
+/metrics in the Prometheus text format.
+
+Histograms live in process memory, so every worker process reports its own
+figures; scrape each worker or aggregate in Prometheus.
+"""
+import threading
+import time
+from bisect import bisect_left
+from contextvars import ContextVar
+
+from django.template.backends.django import DjangoTemplates, Template
+
+
+current_timing = ContextVar('current_timing', default=None)
+
+
+class RequestTiming:
+    """Figures collected while one request is handled"""
+
+    __slots__ = ('started', 'queries', 'db_time', 'template_time', 'cache')
+
+    def __init__(self):
+        self.started = time.perf_counter()
+        self.queries = 0
+        self.db_time = 0.0
+        self.template_time = 0.0
+        self.cache = None
+
+    def header(self, total, size):
+        metrics = [
+            f'db;dur={self.db_time * 1000:.1f};desc="{self.queries} queries"',
+            f'tpl;dur={self.template_time * 1000:.1f}',
+        ]
+        if self.cache:
+            metrics.append(f'cache;desc={self.cache}')
+        if size is not None:
+            metrics.append(f'size;desc="{size} bytes"')
+        metrics.append(f'total;dur={total * 1000:.1f}')
+        return ', '.join(metrics)
+
+
+def record_query(execute, sql, params, many, context):
+    """Database execute wrapper adding each query to the current request"""
+    timing = current_timing.get()
+    if timing is None:
+        return execute(sql, params, many, context)
+    started = time.perf_counter()
+    try:
+        return execute(sql, params, many, context)
+    finally:
+        timing.db_time += time.perf_counter() - started
+        timing.queries += 1
+
+
+def instrument_connection(sender, connection, **kwargs):
+    """connection_created receiver installing record_query"""
+    # The wrapper list outlives reconnections of the same connection
+    if record_query not in connection.execute_wrappers:
+        connection.execute_wrappers.append(record_query)
+
+
+def note_cache(result):
+    """Record how the page cache answered the current request"""
+    timing = current_timing.get()
+    if timing is not None:
+        timing.cache = result
+
+
+class TimedTemplate(Template):
+    def render(self, context=None, request=None):
+        timing = current_timing.get()
+        if timing is None:
+            return super().render(context, request)
+        started = time.perf_counter()
+        try:
+            return super().render(context, request)
+        finally:
+            timing.template_time += time.perf_counter() - started
+
+
+class TimedDjangoTemplates(DjangoTemplates):
+    """Django template backend whose templates report their render time"""
+
+    def from_string(self, template_code):
+        return TimedTemplate(self.engine.from_string(template_code), self)
+
+    def get_template(self, template_name):
+        template = super().get_template(template_name)
+        return TimedTemplate(template.template, self)
+
+
+class Histogram:
+    """Cumulative Prometheus histogram with one series per route"""
+
+    def __init__(self, name, help_text, buckets):
+        self.name = name
+        self.help_text = help_text
+        self.buckets = buckets
+        self._series = {}
+
+    def observe(self, route, value):
+        series = self._series.get(route)
+        if series is None:
+            # counts per bucket plus +Inf, then the sum
+            series = self._series.setdefault(route, [0] * (len(self.buckets) + 1) + [0.0])
+        series[bisect_left(self.buckets, value)] += 1
+        series[-1] += value
+
+    def render(self):
+        yield f'# HELP {self.name} {self.help_text}'
+        yield f'# TYPE {self.name} histogram'
+        for route, series in sorted(self._series.items()):
+            cumulative = 0
+            for bound, count in zip(self.buckets, series):
+                cumulative += count
+                yield f'{self.name}_bucket{{route="{route}",le="{bound}"}} {cumulative}'
+            cumulative += series[len(self.buckets)]
+            yield f'{self.name}_bucket{{route="{route}",le="+Inf"}} {cumulative}'
+            yield f'{self.name}_sum{{route="{route}"}} {series[-1]:.6f}'
+            yield f'{self.name}_count{{route="{route}"}} {cumulative}'
+
+
+class Registry:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.duration = Histogram(
+            'portfolio_request_duration_seconds', 'Time spent handling the request',
+            [0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10],
+        )
+        self.db_time = Histogram(
+            'portfolio_db_duration_seconds', 'Time spent in database queries per request',
+            [0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1],
+        )
+        self.queries = Histogram(
+            'portfolio_db_queries', 'Database queries per request',
+            [0, 1, 2, 3, 5, 10, 20, 50, 100],
+        )
+        self.template_time = Histogram(
+            'portfolio_template_duration_seconds', 'Time spent rendering templates per request',
+            [0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1],
+        )
+        self.response_size = Histogram(
+            'portfolio_response_size_bytes', 'Size of the response body',
+            [1024, 4096, 16384, 65536, 262144, 1048576, 4194304],
+        )
+        self.cache_results = {}
+
+    def observe(self, route, timing, total, size):
+        with self._lock:
+            self.duration.observe(route, total)
+            self.db_time.observe(route, timing.db_time)
+            self.queries.observe(route, timing.queries)
+            self.template_time.observe(route, timing.template_time)
+            if size is not None:
+                self.response_size.observe(route, size)
+            if timing.cache:
+                key = (route, timing.cache)
+                self.cache_results[key] = self.cache_results.get(key, 0) + 1
+
+    def render(self):
+        """Return every metric in the Prometheus text exposition format"""
+        with self._lock:
+            lines = []
+            for histogram in (self.duration, self.db_time, self.queries,
+                              self.template_time, self.response_size):
+                lines.extend(histogram.render())
+            lines.append('# HELP portfolio_page_cache_total Page cache lookups by result')
+            lines.append('# TYPE portfolio_page_cache_total counter')
+            for (route, result), count in sorted(self.cache_results.items()):
+                lines.append(f'portfolio_page_cache_total{{route="{route}",result="{result}"}} {count}')
+        return '\n'.join(lines) + '\n'
+
+
+registry = Registry()
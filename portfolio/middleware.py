@@ -0,0 +1,53 @@
+import time
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+
+from .metrics import RequestTiming, current_timing, registry
+
+
+class ServerTimingMiddleware:
+    """
+    Time each request, report the figures in a Server-Timing header and
+    record them in the per-route histograms served at /metrics.
+
+    Works with both sync and async stacks; keep it first in MIDDLEWARE so
+    the total covers every other middleware.
+    """
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.is_async = iscoroutinefunction(get_response)
+        if self.is_async:
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if self.is_async:
+            return self.__acall__(request)
+        timing = RequestTiming()
+        token = current_timing.set(timing)
+        try:
+            response = self.get_response(request)
+        finally:
+            current_timing.reset(token)
+        return self.finish(request, response, timing)
+
+    async def __acall__(self, request):
+        timing = RequestTiming()
+        token = current_timing.set(timing)
+        try:
+            response = await self.get_response(request)
+        finally:
+            current_timing.reset(token)
+        return self.finish(request, response, timing)
+
+    def finish(self, request, response, timing):
+        total = time.perf_counter() - timing.started
+        size = None if response.streaming else len(response.content)
+        response.headers['Server-Timing'] = timing.header(total, size)
+        match = request.resolver_match
+        route = match.view_name if match else getattr(request, 'metrics_route', 'unmatched')
+        registry.observe(route, timing, total, size)
+        return response
@@ -0,0 +1,34 @@
+# Generated by Django 4.2.7 on 2026-10-18 19:39
+
+from django.db import migrations, models
+import django.db.models.deletion
+import django.utils.timezone
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('portfolio', '0002_contentversion'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='EmailOutbox',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('status', models.CharField(choices=[('pending', 'Pending'), ('sent', 'Sent'), ('failed', 'Failed')], default='pending', max_length=10)),
+                ('attempts', models.PositiveIntegerField(default=0)),
+                ('next_attempt_at', models.DateTimeField(default=django.utils.timezone.now)),
+                ('last_error', models.TextField(blank=True)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('sent_at', models.DateTimeField(blank=True, null=True)),
+                ('contact_message', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, related_name='notification', to='portfolio.contactmessage')),
+            ],
+            options={
+                'verbose_name': 'Email outbox entry',
+                'verbose_name_plural': 'Email outbox',
+                'ordering': ['next_attempt_at'],
+                'indexes': [models.Index(fields=['status', 'next_attempt_at'], name='portfolio_e_status_b722cf_idx')],
+            },
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 4.2.7 on 2026-10-18 19:42
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('portfolio', '0003_emailoutbox'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='contactmessage',
+            name='content_hash',
+            field=models.CharField(blank=True, db_index=True, editable=False, help_text='Digest of sender and message, used to reject duplicates', max_length=64),
+        ),
+    ]
@@ -0,0 +1,39 @@
+from django.db import migrations
+
+
+def create_search_index(apps, schema_editor):
+    if schema_editor.connection.vendor != 'sqlite':
+        return
+    schema_editor.execute(
+        "CREATE VIRTUAL TABLE portfolio_search USING fts5("
+        "title, body, tokenize = 'unicode61 remove_diacritics 2')"
+    )
+    # rowid = pk * 4 + kind (1 project, 2 certificate, 3 recommendation)
+    schema_editor.execute(
+        "INSERT INTO portfolio_search (rowid, title, body) "
+        "SELECT id * 4 + 1, title, short_description || char(10) || description FROM portfolio_project"
+    )
+    schema_editor.execute(
+        "INSERT INTO portfolio_search (rowid, title, body) "
+        "SELECT id * 4 + 2, title, description FROM portfolio_certificate"
+    )
+    schema_editor.execute(
+        "INSERT INTO portfolio_search (rowid, title, body) "
+        "SELECT id * 4 + 3, title, description FROM portfolio_recommendation"
+    )
+
+
+def drop_search_index(apps, schema_editor):
+    if schema_editor.connection.vendor == 'sqlite':
+        schema_editor.execute("DROP TABLE IF EXISTS portfolio_search")
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('portfolio', '0004_contactmessage_content_hash'),
+    ]
+
+    operations = [
+        migrations.RunPython(create_search_index, drop_search_index),
+    ]
@@ -0,0 +1,45 @@
+# Generated by Django 4.2.7 on 2026-10-18 19:59
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('portfolio', '0005_search_index'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='certificate',
+            index=models.Index(fields=['order', '-issue_date'], name='portfolio_c_order_7327bc_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='contactmessage',
+            index=models.Index(fields=['created_at'], name='portfolio_c_created_dada1c_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='contactmessage',
+            index=models.Index(fields=['is_read', 'created_at'], name='portfolio_c_is_read_62b04a_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='project',
+            index=models.Index(fields=['order', '-created_at', 'id'], name='portfolio_p_order_41e7b3_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='project',
+            index=models.Index(fields=['featured', 'order'], name='portfolio_p_feature_f1ff7f_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='recommendation',
+            index=models.Index(fields=['order', 'recommender_name'], name='portfolio_r_order_f10473_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='skill',
+            index=models.Index(fields=['order', 'name'], name='portfolio_s_order_7a7d0a_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='technology',
+            index=models.Index(fields=['name'], name='portfolio_t_name_9d980b_idx'),
+        ),
+    ]
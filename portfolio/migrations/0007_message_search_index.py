@@ -0,0 +1,55 @@
+from django.db import migrations
+
+
+TRIGGERS = [
+    "CREATE TRIGGER portfolio_message_search_insert AFTER INSERT ON portfolio_contactmessage BEGIN "
+    "INSERT INTO portfolio_message_search (rowid, name, email, message) "
+    "VALUES (new.id, new.name, new.email, new.message); END",
+
+    "CREATE TRIGGER portfolio_message_search_delete AFTER DELETE ON portfolio_contactmessage BEGIN "
+    "INSERT INTO portfolio_message_search (portfolio_message_search, rowid, name, email, message) "
+    "VALUES ('delete', old.id, old.name, old.email, old.message); END",
+
+    # Not fired by updates of is_read alone, such as the bulk read/unread actions
+    "CREATE TRIGGER portfolio_message_search_update "
+    "AFTER UPDATE OF name, email, message ON portfolio_contactmessage BEGIN "
+    "INSERT INTO portfolio_message_search (portfolio_message_search, rowid, name, email, message) "
+    "VALUES ('delete', old.id, old.name, old.email, old.message); "
+    "INSERT INTO portfolio_message_search (rowid, name, email, message) "
+    "VALUES (new.id, new.name, new.email, new.message); END",
+]
+
+
+def create_message_search_index(apps, schema_editor):
+    if schema_editor.connection.vendor != 'sqlite':
+        return
+    # External content table: the text stays in portfolio_contactmessage only
+    schema_editor.execute(
+        "CREATE VIRTUAL TABLE portfolio_message_search USING fts5("
+        "name, email, message, content = 'portfolio_contactmessage', content_rowid = 'id', "
+        "tokenize = 'unicode61 remove_diacritics 2')"
+    )
+    for trigger in TRIGGERS:
+        schema_editor.execute(trigger)
+    schema_editor.execute(
+        "INSERT INTO portfolio_message_search (portfolio_message_search) VALUES ('rebuild')"
+    )
+
+
+def drop_message_search_index(apps, schema_editor):
+    if schema_editor.connection.vendor != 'sqlite':
+        return
+    for name in ('insert', 'delete', 'update'):
+        schema_editor.execute(f"DROP TRIGGER IF EXISTS portfolio_message_search_{name}")
+    schema_editor.execute("DROP TABLE IF EXISTS portfolio_message_search")
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('portfolio', '0006_hot_path_indexes'),
+    ]
+
+    operations = [
+        migrations.RunPython(create_message_search_index, drop_message_search_index),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 4.2.7 on 2026-10-18 21:07
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('portfolio', '0007_message_search_index'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='emailoutbox',
+            name='status',
+            field=models.CharField(choices=[('pending', 'Pending'), ('sending', 'Sending'), ('sent', 'Sent'), ('failed', 'Failed')], default='pending', max_length=10),
+        ),
+    ]
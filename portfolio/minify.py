@@ -0,0 +1,210 @@
+"""
+Dependency-free CSS and JavaScript minifiers for collectstatic.
+
+Both are deliberately conservative: they drop comments and redundant
+whitespace but never rename, reorder or rewrite code. The JavaScript
+minifier keeps line breaks, so automatic semicolon insertion behaves exactly
+as in the source. Comments starting with ``/*!`` (licence headers) are kept.
+"""
+import re
+
+
+WORD_RE = re.compile(r'[\w$\\]')
+
+# Characters after which a ``/`` starts a regular expression, not a division
+REGEX_PRECEDERS = set('(,=:[!&|?{};+-*%<>~^')
+REGEX_KEYWORDS = {'return', 'typeof', 'case', 'do', 'else', 'in', 'instanceof', 'new', 'void', 'delete', 'throw'}
+
+# Whitespace around these is never significant in CSS. ':' is missing on
+# purpose: "a :hover" and "a:hover" are different selectors.
+CSS_TIGHT = set('{};,>')
+
+
+def is_word(char):
+    return bool(char) and (WORD_RE.match(char) is not None or ord(char) > 127)
+
+
+def skip_string(source, i):
+    """Return the index just past the string literal starting at ``source[i]``"""
+    quote = source[i]
+    i += 1
+    while i < len(source) and source[i] != quote:
+        if source[i] == '\\':
+            i += 1
+        elif source[i] == '\n' and quote != '`':
+            break
+        i += 1
+    return i + 1
+
+
+def minify_css(source):
+    out = []
+    pending_space = False
+    i, length = 0, len(source)
+    while i < length:
+        char = source[i]
+        if char == '/' and source.startswith('*', i + 1):
+            end = source.find('*/', i + 2)
+            end = length if end == -1 else end + 2
+            if source.startswith('!', i + 2):
+                out.append(source[i:end])
+            i = end
+            continue
+        if char.isspace():
+            pending_space = True
+            i += 1
+            continue
+        if pending_space:
+            pending_space = False
+            if out and out[-1][-1] not in CSS_TIGHT and out[-1][-1] != ':' and char not in CSS_TIGHT:
+                out.append(' ')
+        if char in '"\'':
+            end = skip_string(source, i)
+            out.append(source[i:end])
+            i = end
+            continue
+        if char == '}' and out and out[-1] == ';':
+            out.pop()
+        out.append(char)
+        i += 1
+    return ''.join(out).strip()
+
+
+class JavaScriptMinifier:
+    def __init__(self, source):
+        self.source = source
+        self.out = []
+        # Last significant character and word written, for regex detection
+        self.last = ''
+        self.last_word = ''
+
+    def minify(self):
+        self.code(0, in_template=False)
+        return ''.join(self.out).strip()
+
+    def emit(self, text):
+        self.out.append(text)
+        stripped = text.rstrip()
+        if stripped:
+            self.last = stripped[-1]
+
+    def code(self, i, in_template):
+        """Copy code from ``i``; inside a template substitution stop after its closing brace"""
+        source, length = self.source, len(self.source)
+        depth = 0
+        pending = None
+        while i < length:
+            char = source[i]
+            if char in ' \t\r\n\f\v' or char == '/' and source.startswith(('/', '*'), i + 1):
+                end = i
+                if char == '/' and source.startswith('/', i + 1):
+                    end = source.find('\n', i)
+                    end = length if end == -1 else end
+                elif char == '/':
+                    end = source.find('*/', i + 2)
+                    end = length if end == -1 else end + 2
+                    if source.startswith('!', i + 2):
+                        self.out.append(source[i:end] + '\n')
+                    elif '\n' in source[i:end]:
+                        pending = '\n'
+                else:
+                    end = i + 1
+                    if char == '\n':
+                        pending = '\n'
+                    elif pending is None:
+                        pending = ' '
+                i = end
+                continue
+
+            if pending is not None:
+                self.separate(pending, char)
+                pending = None
+
+            if char in '"\'`':
+                if char == '`':
+                    i = self.template(i)
+                else:
+                    end = skip_string(source, i)
+                    self.emit(source[i:end])
+                    i = end
+                self.last_word = ''
+            elif char == '/' and (self.last in REGEX_PRECEDERS or not self.last
+                                  or self.last_word in REGEX_KEYWORDS):
+                i = self.regex(i)
+            elif is_word(char):
+                end = i
+                while end < length and is_word(source[end]):
+                    end += 1
+                self.emit(source[i:end])
+                self.last_word = source[i:end]
+                i = end
+            else:
+                if in_template:
+                    if char == '{':
+                        depth += 1
+                    elif char == '}':
+                        if depth == 0:
+                            self.emit(char)
+                            return i + 1
+                        depth -= 1
+                self.emit(char)
+                self.last_word = ''
+                i += 1
+        return i
+
+    def separate(self, whitespace, next_char):
+        """Write the whitespace skipped before ``next_char`` if dropping it could change the code"""
+        if whitespace == '\n':
+            if self.out and not self.out[-1].endswith('\n'):
+                self.out.append('\n')
+            return
+        previous = self.last
+        if (is_word(previous) and is_word(next_char)
+                or previous in '+-' and next_char in '+-'
+                or previous == '/' or next_char == '/'):
+            self.out.append(' ')
+
+    def template(self, i):
+        """Copy a template literal verbatim, minifying its substitutions"""
+        source, length = self.source, len(self.source)
+        start = i
+        i += 1
+        while i < length:
+            char = source[i]
+            if char == '\\':
+                i += 2
+            elif char == '`':
+                self.emit(source[start:i + 1])
+                return i + 1
+            elif source.startswith('${', i):
+                self.emit(source[start:i + 2])
+                i = self.code(i + 2, in_template=True)
+                start = i
+            else:
+                i += 1
+        self.emit(source[start:])
+        return length
+
+    def regex(self, i):
+        source, length = self.source, len(self.source)
+        start = i
+        i += 1
+        in_class = False
+        while i < length and source[i] != '\n':
+            char = source[i]
+            if char == '\\':
+                i += 1
+            elif char == '[':
+                in_class = True
+            elif char == ']':
+                in_class = False
+            elif char == '/' and not in_class:
+                break
+            i += 1
+        self.emit(source[start:i + 1])
+        self.last_word = ''
+        return i + 1
+
+
+def minify_js(source):
+    return JavaScriptMinifier(source).minify()
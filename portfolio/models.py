@@ -1,4 +1,7 @@
+import hashlib
+
 from django.db import models
+from django.utils import timezone
 from django.core.validators import MinValueValidator, MaxValueValidator
 
 
@@ -41,6 +44,7 @@ class Skill(models.Model):
 
     class Meta:
         ordering = ['order', 'name']
+        indexes = [models.Index(fields=['order', 'name'])]
 
     def __str__(self):
         return f"{self.name} ({self.proficiency}%)"
@@ -62,6 +66,11 @@ class Project(models.Model):
 
     class Meta:
         ordering = ['order', '-created_at']
+        indexes = [
+            # Public project order, including the id tie-break used by keyset pagination
+            models.Index(fields=['order', '-created_at', 'id']),
+            models.Index(fields=['featured', 'order']),
+        ]
 
     def __str__(self):
         return self.title
@@ -74,6 +83,7 @@ class Technology(models.Model):
 
     class Meta:
         verbose_name_plural = "Technologies"
+        indexes = [models.Index(fields=['name'])]
 
     def __str__(self):
         return self.name
@@ -91,6 +101,7 @@ class Certificate(models.Model):
 
     class Meta:
         ordering = ['order', '-issue_date']
+        indexes = [models.Index(fields=['order', '-issue_date'])]
 
     def __str__(self):
         return f"{self.title} - {self.issuing_organization}"
@@ -108,6 +119,7 @@ class Recommendation(models.Model):
 
     class Meta:
         ordering = ['order', 'recommender_name']
+        indexes = [models.Index(fields=['order', 'recommender_name'])]
 
     def __str__(self):
         return f"{self.title} - {self.recommender_name}"
@@ -120,9 +132,75 @@ class ContactMessage(models.Model):
     message = models.TextField()
     created_at = models.DateTimeField(auto_now_add=True)
     is_read = models.BooleanField(default=False)
+    content_hash = models.CharField(max_length=64, blank=True, editable=False, db_index=True,
+                                    help_text="Digest of sender and message, used to reject duplicates")
 
     class Meta:
         ordering = ['-created_at']
+        # Ascending so that newest-first listings scan them backwards
+        indexes = [
+            models.Index(fields=['created_at']),
+            models.Index(fields=['is_read', 'created_at']),
+        ]
 
     def __str__(self):
         return f"Message from {self.name} - {self.created_at.strftime('%Y-%m-%d %H:%M')}"
+
+    @staticmethod
+    def make_content_hash(email, message):
+        normalized = email.strip().lower() + '\n' + ' '.join(message.split()).lower()
+        return hashlib.sha256(normalized.encode()).hexdigest()
+
+    def save(self, *args, **kwargs):
+        if not self.content_hash:
+            self.content_hash = self.make_content_hash(self.email, self.message)
+        super().save(*args, **kwargs)
+
+
+class EmailOutbox(models.Model):
+    """Email notifications waiting to be sent by the outbox worker"""
+    PENDING = 'pending'
+    SENDING = 'sending'
+    SENT = 'sent'
+    FAILED = 'failed'
+
+    contact_message = models.OneToOneField(
+        ContactMessage, on_delete=models.CASCADE, related_name='notification'
+    )
+    status = models.CharField(max_length=10, default=PENDING, choices=[
+        (PENDING, 'Pending'),
+        (SENDING, 'Sending'),
+        (SENT, 'Sent'),
+        (FAILED, 'Failed'),
+    ])
+    attempts = models.PositiveIntegerField(default=0)
+    next_attempt_at = models.DateTimeField(default=timezone.now)
+    last_error = models.TextField(blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+    sent_at = models.DateTimeField(blank=True, null=True)
+
+    class Meta:
+        verbose_name = "Email outbox entry"
+        verbose_name_plural = "Email outbox"
+        ordering = ['next_attempt_at']
+        indexes = [models.Index(fields=['status', 'next_attempt_at'])]
+
+    def __str__(self):
+        return f"Notification for {self.contact_message} ({self.status})"
+
+
+class ContentVersion(models.Model):
+    """Single-row stamp bumped whenever public content changes"""
+    version = models.PositiveBigIntegerField(default=0)
+    updated_at = models.DateTimeField(default=timezone.now)
+
+    def __str__(self):
+        return f"Content version {self.version}"
+
+    @classmethod
+    def bump(cls):
+        updated = cls.objects.filter(pk=1).update(
+            version=models.F('version') + 1, updated_at=timezone.now()
+        )
+        if not updated:
+            cls.objects.get_or_create(pk=1, defaults={'version': 1})
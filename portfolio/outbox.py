@@ -0,0 +1,103 @@
+"""
+Delivery of contact-form notifications queued in the EmailOutbox table.
+
+The contact view only inserts an outbox row next to the ContactMessage; the
+``send_outbox`` worker drains due rows in batches over a single connection,
+retrying failures with exponential backoff.
+
+Each row is claimed (status SENDING) before its email goes out and saved as
+soon as the send returns, so several workers can run side by side and a
+crash re-sends at most the row in flight. A claim expires after
+OUTBOX_CLAIM_SECONDS, after which another worker picks up the row again.
+"""
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.mail import EmailMessage
+from django.db.models import F
+from django.utils import timezone
+
+from .models import EmailOutbox
+
+
+MAX_ATTEMPTS = getattr(settings, 'OUTBOX_MAX_ATTEMPTS', 8)
+BACKOFF_BASE = getattr(settings, 'OUTBOX_BACKOFF_SECONDS', 30)
+BACKOFF_MAX = 60 * 60
+CLAIM_SECONDS = getattr(settings, 'OUTBOX_CLAIM_SECONDS', 5 * 60)
+
+
+def build_email(contact_message):
+    return EmailMessage(
+        f'New Contact Message from {contact_message.name}',
+        f'Name: {contact_message.name}\nEmail: {contact_message.email}\nMessage: {contact_message.message}',
+        settings.EMAIL_HOST_USER,
+        [settings.ADMIN_EMAIL],
+    )
+
+
+def backoff(attempts):
+    """Seconds to wait before retrying after the given number of failed attempts"""
+    return min(BACKOFF_MAX, BACKOFF_BASE * 2 ** (attempts - 1))
+
+
+def claim(item):
+    """
+    Mark a due row as being sent by this worker and count the attempt.
+
+    The update only matches if no other worker claimed the row since it was
+    read, so each row is sent by one worker at a time.
+    """
+    lease = timezone.now() + timedelta(seconds=CLAIM_SECONDS)
+    claimed = EmailOutbox.objects.filter(
+        pk=item.pk, status=item.status, next_attempt_at=item.next_attempt_at
+    ).update(status=EmailOutbox.SENDING, next_attempt_at=lease, attempts=F('attempts') + 1)
+    if claimed:
+        item.status = EmailOutbox.SENDING
+        item.next_attempt_at = lease
+        item.attempts += 1
+    return bool(claimed)
+
+
+def send_batch(connection, batch_size=50):
+    """
+    Send one batch of due notifications over an open connection.
+
+    Returns ``(sent, failed)`` counts for the batch.
+    """
+    now = timezone.now()
+    # Pending rows that are due, plus claims left behind by a crashed worker
+    batch = list(
+        EmailOutbox.objects.filter(
+            status__in=[EmailOutbox.PENDING, EmailOutbox.SENDING], next_attempt_at__lte=now
+        )
+        .select_related('contact_message')
+        .order_by('next_attempt_at', 'id')[:batch_size]
+    )
+
+    sent = failed = 0
+    for item in batch:
+        if not claim(item):
+            continue
+        try:
+            connection.send_messages([build_email(item.contact_message)])
+        except Exception as exc:
+            failed += 1
+            item.last_error = str(exc)
+            if item.attempts >= MAX_ATTEMPTS:
+                item.status = EmailOutbox.FAILED
+            else:
+                item.status = EmailOutbox.PENDING
+                item.next_attempt_at = timezone.now() + timedelta(seconds=backoff(item.attempts))
+            # The connection may be unusable after an error
+            connection.close()
+            try:
+                connection.open()
+            except Exception:
+                pass
+        else:
+            sent += 1
+            item.status = EmailOutbox.SENT
+            item.sent_at = timezone.now()
+            item.last_error = ''
+        item.save(update_fields=['status', 'next_attempt_at', 'last_error', 'sent_at'])
+    return sent, failed
@@ -0,0 +1,66 @@
+"""
+Keyset pagination over the public project ordering ``(order, -created_at, id)``.
+
+Cursors are opaque tokens encoding the sort key of the last project on a
+page, so fetching any page is a range scan from that key rather than an
+OFFSET over every earlier row.
+"""
+import base64
+import binascii
+from datetime import datetime, timedelta, timezone
+
+from django.conf import settings
+from django.db.models import Q
+
+
+PAGE_SIZE = getattr(settings, 'PROJECTS_PAGE_SIZE', 12)
+MAX_PAGE_SIZE = 100
+
+EPOCH = datetime(1970, 1, 1, tzinfo=timezone.utc)
+
+
+class InvalidCursor(ValueError):
+    pass
+
+
+def sort_key(order, created_at, pk):
+    """Comparable key matching the public ordering"""
+    micros = (created_at - EPOCH) // timedelta(microseconds=1)
+    return (order, -micros, pk)
+
+
+def encode_cursor(project):
+    order, neg_micros, pk = sort_key(project.order, project.created_at, project.pk)
+    raw = f'{order}.{-neg_micros}.{pk}'.encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip('=')
+
+
+def decode_cursor(value):
+    """Return the sort key encoded in a cursor, or None for the first page"""
+    if not value:
+        return None
+    try:
+        raw = base64.urlsafe_b64decode(value + '=' * (-len(value) % 4)).decode()
+        order, micros, pk = (int(part) for part in raw.split('.'))
+    except (binascii.Error, UnicodeDecodeError, ValueError):
+        raise InvalidCursor(value)
+    return (order, -micros, pk)
+
+
+def keyset_filter(queryset, key):
+    """Restrict an ordered project queryset to rows after the given sort key"""
+    order, neg_micros, pk = key
+    created_at = EPOCH + timedelta(microseconds=-neg_micros)
+    return queryset.filter(
+        Q(order__gt=order)
+        | Q(order=order, created_at__lt=created_at)
+        | Q(order=order, created_at=created_at, id__gt=pk)
+    )
+
+
+def parse_limit(request):
+    try:
+        limit = int(request.GET.get('limit', PAGE_SIZE))
+    except ValueError:
+        return PAGE_SIZE
+    return max(1, min(limit, MAX_PAGE_SIZE))
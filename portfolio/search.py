@@ -0,0 +1,181 @@
+"""
+Full-text search over projects, certificates and recommendations.
+
+Documents live in the ``portfolio_search`` SQLite FTS5 table (created by
+migration 0005). Each row's rowid encodes the model and primary key, so
+signals can update a single document without scanning the table and a
+search needs no join to render its results.
+
+Contact messages are indexed separately in ``portfolio_message_search``
+(migration 0007) for the admin. Messages arrive in bulk as well as one by
+one, so that table is an external-content index kept in sync by SQLite
+triggers rather than by signals.
+
+The indexes need SQLite's FTS5 extension; on other databases documents are
+not indexed and searches return nothing.
+"""
+import re
+
+from django.db import connection
+from django.db.models.expressions import RawSQL
+from django.urls import reverse
+from django.utils.html import escape
+from django.utils.safestring import mark_safe
+
+from .models import Project, Certificate, Recommendation
+
+
+SEARCH_TABLE = 'portfolio_search'
+MESSAGE_SEARCH_TABLE = 'portfolio_message_search'
+
+# rowid = pk * KIND_SLOTS + kind code
+KIND_SLOTS = 4
+KINDS = {
+    Project: 1,
+    Certificate: 2,
+    Recommendation: 3,
+}
+KIND_NAMES = {code: model._meta.model_name for model, code in KINDS.items()}
+
+# Title matches weigh more than body matches
+TITLE_WEIGHT = 5.0
+BODY_WEIGHT = 1.0
+
+MAX_QUERY_TERMS = 10
+SNIPPET_TOKENS = 16
+
+# Control characters wrapped around matches by snippet(), swapped for
+# <mark> only after the snippet text has been escaped
+MATCH_START = '\x02'
+MATCH_END = '\x03'
+
+TERM_RE = re.compile(r'\w+')
+
+
+def document(instance):
+    """Return ``(title, body)`` indexed for a model instance"""
+    if isinstance(instance, Project):
+        return instance.title, f'{instance.short_description}\n{instance.description}'
+    return instance.title, instance.description
+
+
+def is_available():
+    return connection.vendor == 'sqlite'
+
+
+def document_rowid(instance):
+    return instance.pk * KIND_SLOTS + KINDS[type(instance)]
+
+
+def index_document(instance):
+    """Add or refresh the search document of ``instance``"""
+    if not is_available():
+        return
+    title, body = document(instance)
+    with connection.cursor() as cursor:
+        cursor.execute(f'DELETE FROM {SEARCH_TABLE} WHERE rowid = %s', [document_rowid(instance)])
+        cursor.execute(
+            f'INSERT INTO {SEARCH_TABLE} (rowid, title, body) VALUES (%s, %s, %s)',
+            [document_rowid(instance), title, body],
+        )
+
+
+def remove_document(instance):
+    if not is_available():
+        return
+    with connection.cursor() as cursor:
+        cursor.execute(f'DELETE FROM {SEARCH_TABLE} WHERE rowid = %s', [document_rowid(instance)])
+
+
+def rebuild_index():
+    """Re-index every document with one INSERT ... SELECT per model"""
+    if not is_available():
+        return
+    bodies = {
+        Project: "short_description || char(10) || description",
+        Certificate: "description",
+        Recommendation: "description",
+    }
+    with connection.cursor() as cursor:
+        cursor.execute(f'DELETE FROM {SEARCH_TABLE}')
+        for model, code in KINDS.items():
+            cursor.execute(
+                f'INSERT INTO {SEARCH_TABLE} (rowid, title, body) '
+                f'SELECT id * {KIND_SLOTS} + {code}, title, {bodies[model]} FROM {model._meta.db_table}'
+            )
+
+
+def build_match(query, prefix=True):
+    """
+    Turn free text into an FTS5 query matching every term.
+
+    Terms are quoted so FTS5 operators typed by users are taken literally.
+    With ``prefix`` the last one matches as a prefix to support
+    search-as-you-type.
+    """
+    terms = TERM_RE.findall(query)[:MAX_QUERY_TERMS]
+    if not terms:
+        return None
+    return ' '.join(f'"{term}"' for term in terms) + ('*' if prefix else '')
+
+
+def render_snippet(snippet):
+    return mark_safe(
+        escape(snippet).replace(MATCH_START, '<mark>').replace(MATCH_END, '</mark>')
+    )
+
+
+def result_url(kind, pk):
+    if kind == 'project':
+        return reverse('project_detail', args=[pk])
+    return reverse('about') + ('#certificates' if kind == 'certificate' else '#recommendations')
+
+
+def search(query, limit=20, offset=0):
+    """Return up to ``limit`` results for ``query``, best match first"""
+    match = build_match(query)
+    if match is None or not is_available():
+        return []
+    with connection.cursor() as cursor:
+        cursor.execute(
+            f"SELECT rowid, title, snippet({SEARCH_TABLE}, -1, %s, %s, '…', %s) "
+            f'FROM {SEARCH_TABLE} WHERE {SEARCH_TABLE} MATCH %s '
+            f'ORDER BY bm25({SEARCH_TABLE}, %s, %s) LIMIT %s OFFSET %s',
+            [MATCH_START, MATCH_END, SNIPPET_TOKENS, match,
+             TITLE_WEIGHT, BODY_WEIGHT, limit, offset],
+        )
+        rows = cursor.fetchall()
+
+    results = []
+    for rowid, title, snippet in rows:
+        kind, pk = KIND_NAMES[rowid % KIND_SLOTS], rowid // KIND_SLOTS
+        results.append({
+            'kind': kind,
+            'id': pk,
+            'title': title,
+            'snippet': render_snippet(snippet),
+            'url': result_url(kind, pk),
+        })
+    return results
+
+
+def filter_messages(queryset, query):
+    """Restrict a ContactMessage queryset to the messages matching every term of ``query``"""
+    # Whole terms only: a short prefix, or the "com" of an e-mail address,
+    # expands to most of a large message table
+    match = build_match(query, prefix=False)
+    if match is None:
+        return queryset
+    return queryset.filter(pk__in=RawSQL(
+        f'SELECT rowid FROM {MESSAGE_SEARCH_TABLE} WHERE {MESSAGE_SEARCH_TABLE} MATCH %s', [match]
+    ))
+
+
+def rebuild_message_index():
+    """Re-read every contact message into the message index"""
+    if not is_available():
+        return
+    with connection.cursor() as cursor:
+        cursor.execute(
+            f"INSERT INTO {MESSAGE_SEARCH_TABLE} ({MESSAGE_SEARCH_TABLE}) VALUES ('rebuild')"
+        )
@@ -0,0 +1,160 @@
+"""
+Helpers for seeding large synthetic datasets used by the performance checks
+and the generate_dataset command.
+
+Rows are inserted with bulk_create, and projects (with their technology
+links) are generated one batch at a time so memory stays flat for datasets of
+millions of rows. Every batch is committed on its own, so the site keeps
+serving writes while a large dataset is seeded into a live database.
+"""
+import random
+from datetime import date, timedelta
+
+from django.db import connection
+
+from .db import immediate_atomic
+
+from .models import (
+    Portfolio, Project, Skill, Technology,
+    Certificate, Recommendation, ContactMessage
+)
+from .search import rebuild_index
+
+
+SKILL_CATEGORIES = ['programming', 'frameworks', 'tools', 'databases', 'other']
+
+WORDS = (
+    'api app build cache client cloud data deploy design dashboard engine fast '
+    'feature guide layout mobile model page platform query react search server '
+    'service site stack store stream team test tool update user view web'
+).split()
+
+
+SYLLABLES = 'ba de fi go ka le mi no pa re si to vu xa ze'.split()
+
+
+def sentence_pool(rng, size=1024, vocabulary=2000):
+    """
+    Sentences reused for generated text, much cheaper than one per row.
+
+    Made-up words pad the vocabulary so that, like real text, most terms
+    occur in only a small share of the documents.
+    """
+    words = WORDS + [''.join(rng.choices(SYLLABLES, k=rng.randint(2, 4))) for _ in range(vocabulary)]
+    return [' '.join(rng.choices(words, k=rng.randint(5, 14))).capitalize() + '.' for _ in range(size)]
+
+
+def insert_links(pairs):
+    """
+    Insert ``(project_id, technology_id)`` rows into the M2M through table.
+
+    The through table holds most of the rows of a large dataset; a plain
+    executemany is several times faster than building model instances for
+    bulk_create.
+    """
+    through = Project.technologies.through._meta
+    columns = [through.get_field(name).column for name in ('project', 'technology')]
+    with connection.cursor() as cursor:
+        cursor.executemany(
+            'INSERT INTO {} ({}, {}) VALUES (%s, %s)'.format(
+                connection.ops.quote_name(through.db_table), *map(connection.ops.quote_name, columns)
+            ),
+            pairs,
+        )
+
+
+def seed_dataset(projects=500, technologies=30, skills=40, certificates=25,
+                 recommendations=25, messages=0, techs_per_project=5, batch_size=500,
+                 seed=0, progress=None):
+    """
+    Bulk insert a synthetic dataset and return the number of projects created.
+
+    ``progress`` is called with the model name and the number of rows
+    inserted so far after every batch. Numbered names continue from the rows
+    already there, so a rerun adds rows rather than duplicating names.
+    """
+    rng = random.Random(seed)
+    progress = progress or (lambda name, count: None)
+    sentences = sentence_pool(rng)
+
+    def numbered(model, count):
+        existing = model.objects.count()
+        return range(existing, existing + count)
+
+    if not Portfolio.objects.exists():
+        Portfolio.objects.create(
+            name='Benchmark User',
+            title='Full Stack Developer',
+            bio='Synthetic portfolio used for performance checks.',
+            email='benchmark@example.com',
+        )
+
+    with immediate_atomic():
+        techs = Technology.objects.bulk_create(
+            [Technology(name=f'Tech {i}', color='#%06x' % rng.randrange(0x1000000))
+             for i in numbered(Technology, technologies)],
+            batch_size=batch_size,
+        )
+        Skill.objects.bulk_create(
+            [Skill(name=f'Skill {i}', proficiency=rng.randint(1, 100),
+                   category=SKILL_CATEGORIES[i % len(SKILL_CATEGORIES)], order=i)
+             for i in numbered(Skill, skills)],
+            batch_size=batch_size,
+        )
+
+    project_numbers = numbered(Project, projects)
+    for start in range(0, projects, batch_size):
+        with immediate_atomic():
+            created = Project.objects.bulk_create(
+                [Project(title=f'Project {i}',
+                         description=' '.join(rng.choices(sentences, k=rng.randint(3, 8))),
+                         short_description=f'Synthetic project {i}',
+                         image=f'projects/project-{i}.jpg',
+                         featured=i % 10 == 0,
+                         order=i % 50)
+                 for i in project_numbers[start:start + batch_size]],
+            )
+            insert_links(
+                [(project.pk, tech.pk)
+                 for project in created
+                 for tech in rng.sample(techs, min(techs_per_project, len(techs)))]
+            )
+        progress('projects', start + len(created))
+
+    today = date.today()
+    with immediate_atomic():
+        Certificate.objects.bulk_create(
+            [Certificate(title=f'Certificate {i}', issuing_organization=f'Org {i % 7}',
+                         issue_date=today - timedelta(days=30 * i),
+                         certificate_file=f'certificates/certificate-{i}.pdf', order=i)
+             for i in numbered(Certificate, certificates)],
+            batch_size=batch_size,
+        )
+        Recommendation.objects.bulk_create(
+            [Recommendation(title=f'Recommendation {i}', recommender_name=f'Person {i}',
+                            recommender_position='Engineering Manager',
+                            recommender_company=f'Company {i % 5}',
+                            letter_file=f'recommendations/letter-{i}.pdf', order=i)
+             for i in numbered(Recommendation, recommendations)],
+            batch_size=batch_size,
+        )
+
+    message_numbers = numbered(ContactMessage, messages)
+    for start in range(0, messages, batch_size):
+        batch = []
+        for i in message_numbers[start:start + batch_size]:
+            email = f'sender{rng.randrange(max(messages // 3, 1))}@example.com'
+            text = ' '.join(rng.choices(sentences, k=rng.randint(1, 6)))
+            batch.append(ContactMessage(
+                name=f'Sender {i}', email=email, message=text,
+                is_read=rng.random() < 0.7,
+                content_hash=ContactMessage.make_content_hash(email, text),
+            ))
+        with immediate_atomic():
+            ContactMessage.objects.bulk_create(batch)
+        progress('messages', start + len(batch))
+
+    # bulk_create bypasses the signals that keep the search index in sync
+    with immediate_atomic():
+        rebuild_index()
+    return projects
@@ -0,0 +1,309 @@
+"""
+Serve collected static files and uploaded media in production.
+
+StaticFilesMiddleware answers requests under STATIC_URL before sessions,
+CSRF or the URL resolver run. When the client accepts it, the ``.br`` or
+``.gz`` sibling written by collectstatic is sent as it is, so a response
+costs a dictionary lookup and opening a file, never a compression.
+
+Content-hashed names listed in the staticfiles manifest never change, so
+they are cached for a year as immutable and their file details are kept in
+memory. Other files are checked on every request and revalidated by
+browsers through Last-Modified.
+
+serve_media() sends files from MEDIA_ROOT (resumes, certificates, letters,
+image derivatives) with a strong ETag, answers conditional requests, and
+sends a single byte range for resumed downloads. Bodies are FileResponses,
+which WSGI servers such as gunicorn hand to os.sendfile(). With
+MEDIA_OFFLOAD set, the view only checks the file exists and lets nginx
+(``X-Accel-Redirect``) or Apache/lighttpd (``X-Sendfile``) send it.
+"""
+import mimetypes
+import os
+import posixpath
+import re
+from urllib.parse import quote, unquote
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+from django.contrib.staticfiles.storage import staticfiles_storage
+from django.core.exceptions import SuspiciousFileOperation
+from django.http import FileResponse, Http404, HttpResponse, HttpResponseNotModified
+from django.utils._os import safe_join
+from django.utils.cache import get_conditional_response
+from django.utils.http import http_date, parse_http_date_safe
+from django.views.decorators.http import require_safe
+from django.views.static import was_modified_since
+
+from .compression import ENCODING_SUFFIXES
+
+
+IMMUTABLE_CACHE_CONTROL = 'public, max-age=31536000, immutable'
+REVALIDATE_CACHE_CONTROL = 'public, max-age=60'
+
+# Preferred encoding first
+ENCODINGS = ('br', 'gzip')
+
+# Uploads can be replaced under the same name, so they are revalidated
+MEDIA_CACHE_CONTROL = getattr(settings, 'MEDIA_CACHE_CONTROL', 'public, max-age=3600')
+# None, 'x-accel-redirect' or 'x-sendfile'
+MEDIA_OFFLOAD = getattr(settings, 'MEDIA_OFFLOAD', None)
+# The nginx ``internal`` location aliased to MEDIA_ROOT
+MEDIA_OFFLOAD_PREFIX = getattr(settings, 'MEDIA_OFFLOAD_PREFIX', '/protected-media/')
+
+RANGE_RE = re.compile(r'bytes=(\d*)-(\d*)')
+
+
+def accepted_encodings(header):
+    """Return the content codings an Accept-Encoding header does not refuse"""
+    accepted = set()
+    for part in header.split(','):
+        coding, _, params = part.partition(';')
+        quality = params.strip().lower()
+        if quality.startswith('q='):
+            try:
+                if float(quality[2:]) == 0:
+                    continue
+            except ValueError:
+                continue
+        accepted.add(coding.strip().lower())
+    return accepted
+
+
+class StaticFile:
+    """A collected file and the pre-compressed variants found next to it"""
+
+    __slots__ = ('path', 'content_type', 'size', 'mtime', 'variants')
+
+    def __init__(self, path):
+        stat = os.stat(path)
+        self.path = path
+        self.content_type = mimetypes.guess_type(path)[0] or 'application/octet-stream'
+        if self.content_type.startswith('text/') or self.content_type == 'application/javascript':
+            self.content_type += '; charset=utf-8'
+        self.size = stat.st_size
+        self.mtime = stat.st_mtime
+        self.variants = {}
+        for encoding in ENCODINGS:
+            sibling = path + ENCODING_SUFFIXES[encoding]
+            try:
+                self.variants[encoding] = (sibling, os.stat(sibling).st_size)
+            except FileNotFoundError:
+                pass
+
+    def select(self, accept_encoding):
+        """Return ``(path, size, encoding)`` of the variant to send"""
+        if self.variants and accept_encoding:
+            accepted = accepted_encodings(accept_encoding)
+            for encoding, (path, size) in self.variants.items():
+                if encoding in accepted:
+                    return path, size, encoding
+        return self.path, self.size, None
+
+
+def static_file_headers(response, static_file, size, encoding, cache_control):
+    response.headers['Content-Type'] = static_file.content_type
+    response.headers['Content-Length'] = str(size)
+    response.headers['Last-Modified'] = http_date(static_file.mtime)
+    response.headers['Cache-Control'] = cache_control
+    if static_file.variants:
+        response.headers['Vary'] = 'Accept-Encoding'
+    if encoding:
+        response.headers['Content-Encoding'] = encoding
+    return response
+
+
+class StaticFilesMiddleware:
+    """Serve STATIC_URL from STATIC_ROOT, preferring pre-compressed variants"""
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.is_async = iscoroutinefunction(get_response)
+        if self.is_async:
+            markcoroutinefunction(self)
+        self.prefix = settings.STATIC_URL if settings.STATIC_URL.startswith('/') else '/' + settings.STATIC_URL
+        self.root = str(settings.STATIC_ROOT) if settings.STATIC_ROOT else None
+        self.immutable = set(getattr(staticfiles_storage, 'hashed_files', {}).values())
+        self.files = {}
+
+    def __call__(self, request):
+        if self.is_async:
+            return self.__acall__(request)
+        response = self.serve(request)
+        if response is None:
+            response = self.get_response(request)
+        return response
+
+    async def __acall__(self, request):
+        # A stat() and an open() block for less time than a thread hop takes
+        response = self.serve(request)
+        if response is None:
+            response = await self.get_response(request)
+        return response
+
+    def serve(self, request):
+        if (self.root is None or request.method not in ('GET', 'HEAD')
+                or not request.path_info.startswith(self.prefix)):
+            return None
+        name = posixpath.normpath(unquote(request.path_info[len(self.prefix):])).lstrip('/')
+        static_file = self.find(name)
+        if static_file is None:
+            return None
+        request.metrics_route = 'static'
+
+        if name in self.immutable:
+            cache_control = IMMUTABLE_CACHE_CONTROL
+        else:
+            cache_control = REVALIDATE_CACHE_CONTROL
+            if not was_modified_since(request.META.get('HTTP_IF_MODIFIED_SINCE'), static_file.mtime):
+                return HttpResponseNotModified()
+
+        path, size, encoding = static_file.select(request.META.get('HTTP_ACCEPT_ENCODING', ''))
+        if request.method == 'HEAD':
+            response = HttpResponse()
+        else:
+            response = FileResponse(open(path, 'rb'))
+            del response.headers['Content-Disposition']
+        return static_file_headers(response, static_file, size, encoding, cache_control)
+
+    def find(self, name):
+        static_file = self.files.get(name)
+        if static_file is not None:
+            return static_file
+        try:
+            path = safe_join(self.root, name)
+        except SuspiciousFileOperation:
+            return None
+        if not os.path.isfile(path):
+            return None
+        static_file = StaticFile(path)
+        # Only hashed names are guaranteed never to change on disk
+        if name in self.immutable:
+            self.files[name] = static_file
+        return static_file
+
+
+class RangeNotSatisfiable(Exception):
+    pass
+
+
+def file_etag(stat):
+    """Strong ETag from the size and the modification time in nanoseconds"""
+    return f'"{stat.st_mtime_ns:x}-{stat.st_size:x}"'
+
+
+def parse_range(header, size):
+    """
+    Return the inclusive ``(first, last)`` byte positions a Range header asks
+    for, or None to send the whole file. Only single ranges are honoured;
+    ignoring the rest is always allowed.
+    """
+    match = RANGE_RE.fullmatch(header.strip())
+    if match is None or not any(match.groups()):
+        return None
+    first, last = match.groups()
+    if not first:
+        # bytes=-500 is the last 500 bytes
+        if int(last) == 0 or size == 0:
+            raise RangeNotSatisfiable
+        return max(size - int(last), 0), size - 1
+    first = int(first)
+    last = size - 1 if not last else min(int(last), size - 1)
+    if first > last:
+        if first >= size:
+            raise RangeNotSatisfiable
+        # bytes=500-100 is invalid syntax
+        return None
+    return first, last
+
+
+def if_range_matches(header, etag, mtime):
+    """Whether an If-Range validator still matches the file, comparing strongly"""
+    if not header:
+        return True
+    if header.startswith(('"', 'W/')):
+        return header == etag
+    return parse_http_date_safe(header) == int(mtime)
+
+
+class FileRange:
+    """The ``length`` bytes of an open file starting at ``first``"""
+
+    def __init__(self, file, first, length):
+        file.seek(first)
+        self.file = file
+        self.name = file.name
+        self.remaining = length
+
+    def read(self, size=-1):
+        if size < 0 or size > self.remaining:
+            size = self.remaining
+        data = self.file.read(size)
+        self.remaining -= len(data)
+        return data
+
+    def fileno(self):
+        # gunicorn's sendfile() starts at the current offset and stops at Content-Length
+        return self.file.fileno()
+
+    def close(self):
+        self.file.close()
+
+
+def offload_response(name, path):
+    response = HttpResponse(content_type=mimetypes.guess_type(path)[0] or 'application/octet-stream')
+    if MEDIA_OFFLOAD == 'x-accel-redirect':
+        response.headers['X-Accel-Redirect'] = quote(MEDIA_OFFLOAD_PREFIX.rstrip('/') + '/' + name)
+    else:
+        response.headers['X-Sendfile'] = path
+    response.headers['Cache-Control'] = MEDIA_CACHE_CONTROL
+    return response
+
+
+@require_safe
+def serve_media(request, path):
+    """Send a file from MEDIA_ROOT, honouring conditional and Range requests"""
+    name = posixpath.normpath(unquote(path)).lstrip('/')
+    try:
+        full_path = safe_join(settings.MEDIA_ROOT, name)
+        stat = os.stat(full_path)
+    except (SuspiciousFileOperation, OSError):
+        raise Http404
+    if not os.path.isfile(full_path):
+        raise Http404
+    if MEDIA_OFFLOAD:
+        # The web server handles Range and conditional requests itself
+        return offload_response(name, full_path)
+
+    etag = file_etag(stat)
+    response = get_conditional_response(request, etag=etag, last_modified=int(stat.st_mtime))
+    if response is None:
+        byte_range = None
+        if if_range_matches(request.META.get('HTTP_IF_RANGE'), etag, stat.st_mtime):
+            try:
+                byte_range = parse_range(request.META.get('HTTP_RANGE', ''), stat.st_size)
+            except RangeNotSatisfiable:
+                response = HttpResponse(status=416)
+                response.headers['Content-Range'] = f'bytes */{stat.st_size}'
+                return response
+
+        first, last = byte_range or (0, stat.st_size - 1)
+        length = last - first + 1
+        if request.method == 'HEAD':
+            response = HttpResponse(content_type=mimetypes.guess_type(full_path)[0] or 'application/octet-stream')
+        elif byte_range:
+            response = FileResponse(FileRange(open(full_path, 'rb'), first, length))
+        else:
+            response = FileResponse(open(full_path, 'rb'))
+        if byte_range:
+            response.status_code = 206
+            response.headers['Content-Range'] = f'bytes {first}-{last}/{stat.st_size}'
+        response.headers['Content-Length'] = str(length)
+        response.headers['Accept-Ranges'] = 'bytes'
+    response.headers['ETag'] = etag
+    response.headers['Last-Modified'] = http_date(stat.st_mtime)
+    response.headers['Cache-Control'] = MEDIA_CACHE_CONTROL
+    return response
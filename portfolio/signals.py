@@ -0,0 +1,70 @@
+from django.db.models.signals import post_save, post_delete, m2m_changed
+from django.dispatch import receiver
+
+from .cache import bump_content_version, invalidate_pages
+from .search import index_document, remove_document
+from .models import (
+    Portfolio, Project, Skill, Technology,
+    Certificate, Recommendation
+)
+
+
+def content_changed(*pages):
+    invalidate_pages(*pages)
+    bump_content_version()
+
+
+@receiver([post_save, post_delete], sender=Portfolio)
+def portfolio_changed(sender, instance, **kwargs):
+    # Every page title shows the portfolio name
+    content_changed('home', 'about', 'projects', 'project_detail', 'search')
+
+
+@receiver([post_save, post_delete], sender=Skill)
+def skill_changed(sender, instance, **kwargs):
+    content_changed('home', 'about')
+
+
+@receiver([post_save, post_delete], sender=Certificate)
+@receiver([post_save, post_delete], sender=Recommendation)
+def about_content_changed(sender, instance, **kwargs):
+    content_changed('about', 'search')
+
+
+@receiver([post_save, post_delete], sender=Technology)
+def technology_changed(sender, instance, **kwargs):
+    # Technology badges appear on every project card and detail page
+    content_changed('home', 'projects', 'project_detail')
+
+
+@receiver([post_save, post_delete], sender=Project)
+def project_changed(sender, instance, **kwargs):
+    content_changed('home', 'projects', 'search', f'project_detail:{instance.pk}')
+
+
+@receiver(post_save, sender=Project)
+@receiver(post_save, sender=Certificate)
+@receiver(post_save, sender=Recommendation)
+def searchable_saved(sender, instance, **kwargs):
+    index_document(instance)
+
+
+@receiver(post_delete, sender=Project)
+@receiver(post_delete, sender=Certificate)
+@receiver(post_delete, sender=Recommendation)
+def searchable_deleted(sender, instance, **kwargs):
+    remove_document(instance)
+
+
+@receiver(m2m_changed, sender=Project.technologies.through)
+def project_technologies_changed(sender, instance, action, reverse, pk_set, **kwargs):
+    if not action.startswith('post_'):
+        return
+    if reverse:
+        # instance is a Technology; pk_set holds the affected projects
+        project_pages = [f'project_detail:{pk}' for pk in pk_set or ()]
+        if action == 'post_clear':
+            project_pages = ['project_detail']
+    else:
+        project_pages = [f'project_detail:{instance.pk}']
+    content_changed('home', 'projects', *project_pages)
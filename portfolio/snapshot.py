@@ -0,0 +1,74 @@
+"""
+Process-wide snapshot of the content shown around the site.
+
+The profile, the skills (also grouped by category), the certificates, the
+recommendations and the technologies are small and rarely edited, so each
+worker process loads them together once and keeps them until the
+ContentVersion stamp changes. The save/delete signals bump the stamp, so
+every worker rebuilds its copy on its first request after an edit, and the
+views read these records from the snapshot instead of querying for them.
+"""
+import threading
+from types import MappingProxyType
+
+from .cache import get_content_version
+from .models import Certificate, Portfolio, Recommendation, Skill, Technology
+
+
+class ContentSnapshot:
+    """Read-only content of one content version, shared by all threads"""
+
+    __slots__ = (
+        'version', 'portfolio', 'skills', 'skill_categories',
+        'certificates', 'recommendations', 'technologies',
+    )
+
+    def __init__(self, version, portfolio, skills, certificates, recommendations, technologies):
+        skill_categories = {}
+        for skill in skills:
+            skill_categories.setdefault(skill.category, []).append(skill)
+        values = {
+            'version': version,
+            'portfolio': portfolio,
+            'skills': tuple(skills),
+            'skill_categories': MappingProxyType(
+                {category: tuple(members) for category, members in skill_categories.items()}
+            ),
+            'certificates': tuple(certificates),
+            'recommendations': tuple(recommendations),
+            'technologies': tuple(technologies),
+        }
+        for name, value in values.items():
+            object.__setattr__(self, name, value)
+
+    def __setattr__(self, name, value):
+        raise AttributeError('ContentSnapshot is immutable')
+
+
+def build_snapshot(version):
+    return ContentSnapshot(
+        version,
+        portfolio=Portfolio.objects.first(),
+        skills=Skill.objects.order_by('order', 'name'),
+        certificates=Certificate.objects.order_by('order', '-issue_date'),
+        recommendations=Recommendation.objects.order_by('order', 'recommender_name'),
+        technologies=Technology.objects.order_by('name'),
+    )
+
+
+_lock = threading.Lock()
+_current = None
+
+
+def get_snapshot():
+    """Return the snapshot of the current content version, rebuilding it if stale"""
+    global _current
+    version = get_content_version()[0]
+    snapshot = _current
+    if snapshot is not None and snapshot.version == version:
+        return snapshot
+    with _lock:
+        snapshot = _current
+        if snapshot is None or snapshot.version != version:
+            snapshot = _current = build_snapshot(version)
+    return snapshot
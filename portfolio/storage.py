@@ -0,0 +1,83 @@
+"""
+Static files storage used by collectstatic.
+
+On top of Django's manifest storage (content-hashed names listed in
+``staticfiles.json``) it minifies CSS and JavaScript before they are hashed,
+so the hash covers the bytes actually served, and writes ``.gz`` / ``.br``
+siblings of every text asset for serving.py to send as they are.
+"""
+import os
+
+from django.contrib.staticfiles.storage import ManifestStaticFilesStorage
+from django.core.files.base import ContentFile
+
+from .compression import ENCODING_SUFFIXES, is_compressible, write_compressed_variants
+from .minify import minify_css, minify_js
+
+
+MINIFIERS = {
+    '.css': minify_css,
+    '.js': minify_js,
+}
+
+
+def minifier_for(name):
+    base, ext = os.path.splitext(name)
+    # Vendor files shipped minified gain nothing from another pass
+    if base.endswith('.min'):
+        return None
+    return MINIFIERS.get(ext.lower())
+
+
+class CompressedManifestStaticFilesStorage(ManifestStaticFilesStorage):
+
+    def post_process(self, paths, dry_run=False, **options):
+        if dry_run:
+            return
+        paths = self.minify(paths)
+        yield from super().post_process(paths, dry_run, **options)
+        self.compress(set(paths) | set(self.hashed_files.values()))
+
+    def minify(self, paths):
+        """Replace the collected copies of CSS and JS files with minified ones"""
+        minified = dict(paths)
+        for name, (storage, path) in paths.items():
+            minify = minifier_for(name)
+            if minify is None:
+                continue
+            with storage.open(path) as f:
+                source = f.read()
+            try:
+                content = minify(source.decode('utf-8')).encode('utf-8')
+            except UnicodeDecodeError:
+                continue
+            if len(content) >= len(source):
+                continue
+            if self.exists(name):
+                with self.open(name) as f:
+                    current = f.read()
+                if current != content:
+                    self.delete(name)
+            if not self.exists(name):
+                self._save(name, ContentFile(content))
+            # Hash the minified copy rather than the source file
+            minified[name] = (self, name)
+        return minified
+
+    def compress(self, names):
+        for name in names:
+            if not is_compressible(name) or not self.exists(name):
+                continue
+            path = self.path(name)
+            if self.is_compressed(path):
+                continue
+            with open(path, 'rb') as f:
+                write_compressed_variants(path, f.read())
+
+    def is_compressed(self, path):
+        """Whether a variant newer than ``path`` already exists, as after an earlier run"""
+        mtime = os.path.getmtime(path)
+        return any(
+            os.path.exists(path + suffix) and os.path.getmtime(path + suffix) >= mtime
+            for suffix in ENCODING_SUFFIXES.values()
+        )
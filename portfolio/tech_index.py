@@ -0,0 +1,132 @@
+"""
+In-memory inverted index from technology to project IDs.
+
+The index maps each normalized technology name to the IDs of the projects
+using it, kept in the public ordering ``(order, -created_at, id)``. It is
+rebuilt lazily, once per process, whenever the content version changes, and
+every signal that touches projects or their technologies bumps that version.
+
+as_json() is the same index in the compact form main.js filters with, so
+the projects page needs no API call per filter click.
+"""
+import gzip
+import json
+import threading
+from collections import defaultdict
+
+from .cache import get_content_version
+from .models import Project, Technology
+from .pagination import sort_key
+
+
+def normalize_tech(name):
+    """Normalize a technology name for exact, case-insensitive lookups"""
+    return ' '.join(name.casefold().split())
+
+
+def parse_tech_query(request):
+    """Return ``(names, match_all)`` from ``?tech=a,b&mode=all``"""
+    raw = request.GET.get('tech', '')
+    names = [normalize_tech(name) for name in raw.split(',') if name.strip()]
+    return names, request.GET.get('mode') == 'all'
+
+
+class TechnologyIndex:
+    """Technology → ordered project IDs"""
+
+    def __init__(self, ordered_ids, keys, matched):
+        self.ordered_ids = ordered_ids
+        self.rank = {pk: position for position, pk in enumerate(ordered_ids)}
+        self.keys = keys
+        self.postings = {
+            name: sorted(ids, key=self.rank.__getitem__) for name, ids in matched.items()
+        }
+        self._json = None
+        self._json_gzip = None
+
+    def as_json(self):
+        """
+        Return the index as compact JSON bytes. ``order`` lists every project
+        ID in public order; each entry of ``techs`` lists the positions of a
+        technology's projects in ``order``, each as the gap from the previous
+        one, which keeps the numbers small.
+        """
+        if self._json is None:
+            techs = {}
+            for name, ids in self.postings.items():
+                previous = 0
+                gaps = []
+                for position in map(self.rank.__getitem__, ids):
+                    gaps.append(position - previous)
+                    previous = position
+                techs[name] = gaps
+            self._json = json.dumps(
+                {'order': self.ordered_ids, 'techs': techs}, separators=(',', ':')
+            ).encode()
+        return self._json
+
+    def as_json_gzip(self):
+        if self._json_gzip is None:
+            self._json_gzip = gzip.compress(self.as_json(), mtime=0)
+        return self._json_gzip
+
+    def lookup(self, names, match_all=False):
+        """Return project IDs matching any (or all) of the given names, in public order"""
+        sets = [set(self.postings.get(name, ())) for name in names]
+        if not sets:
+            return []
+        if match_all:
+            sets.sort(key=len)
+            matched = sets[0].intersection(*sets[1:])
+        else:
+            matched = set().union(*sets)
+        return sorted(matched, key=self.rank.__getitem__)
+
+    def page(self, names, match_all=False, after=None, limit=None):
+        """Return up to ``limit`` matching IDs that sort after the key ``after``"""
+        ids = self.lookup(names, match_all)
+        lo, hi = 0, len(ids)
+        if after is not None:
+            while lo < hi:
+                mid = (lo + hi) // 2
+                if self.keys[ids[mid]] <= after:
+                    lo = mid + 1
+                else:
+                    hi = mid
+        return ids[lo:lo + limit] if limit is not None else ids[lo:]
+
+
+def build_index():
+    rows = Project.objects.order_by('order', '-created_at', 'id').values_list('id', 'order', 'created_at')
+    ordered_ids = []
+    keys = {}
+    for pk, order, created_at in rows.iterator():
+        ordered_ids.append(pk)
+        keys[pk] = sort_key(order, created_at, pk)
+    tech_names = {
+        pk: normalize_tech(name) for pk, name in Technology.objects.values_list('id', 'name')
+    }
+    matched = defaultdict(set)
+    links = Project.technologies.through.objects.values_list('project_id', 'technology_id')
+    for project_id, technology_id in links.iterator():
+        matched[tech_names[technology_id]].add(project_id)
+    return TechnologyIndex(ordered_ids, keys, matched)
+
+
+_lock = threading.Lock()
+_current = (None, None)
+
+
+def get_index():
+    """Return the index for the current content version, rebuilding if stale"""
+    global _current
+    version = get_content_version()[0]
+    cached_version, index = _current
+    if index is not None and cached_version == version:
+        return index
+    with _lock:
+        cached_version, index = _current
+        if index is None or cached_version != version:
+            index = build_index()
+            _current = (version, index)
+    return index
@@ -0,0 +1,64 @@
+import hashlib
+
+from django import template
+from django.core.cache import cache
+from django.template import Engine
+from django.utils.safestring import mark_safe
+
+from portfolio.cache import PAGE_CACHE_TIMEOUT
+from portfolio.images import get_many_derivatives
+
+
+register = template.Library()
+
+CARD_TEMPLATE = 'portfolio/includes/project_card.html'
+# Bump when the card template changes, so cached cards are rendered again
+CARD_VERSION = 2
+
+
+def card_key(project, detailed, derivatives=None):
+    """
+    Cache key of a rendered card.
+
+    The key covers everything the card shows: the project's own fields via
+    updated_at, the name and colour of each technology, and the derivatives
+    of the image, so editing any of them or generating derivatives later
+    simply leads to a new key.
+    """
+    technologies = [(tech.pk, tech.name, tech.color) for tech in project.technologies.all()]
+    state = repr((project.updated_at.isoformat(), technologies, derivatives, detailed))
+    return f'project-card:{CARD_VERSION}:{project.pk}:{hashlib.md5(state.encode()).hexdigest()}'
+
+
+def render_project_cards(projects, detailed=False, engine=None, autoescape=True):
+    """
+    Return the HTML of each project's card, reusing cached HTML for unchanged projects.
+
+    All cards are fetched with one get_many, and only the missing ones are
+    rendered. ``detailed`` shows the truncated description and a details
+    link instead of the short description.
+    """
+    projects = list(projects)
+    derivatives = get_many_derivatives([project.image.name for project in projects if project.image])
+    keys = [card_key(project, detailed, derivatives.get(project.image.name)) for project in projects]
+    cached = cache.get_many(keys)
+
+    card_template = (engine or Engine.get_default()).get_template(CARD_TEMPLATE)
+    cards, rendered = [], {}
+    for project, key in zip(projects, keys):
+        card = cached.get(key)
+        if card is None:
+            card = rendered[key] = card_template.render(
+                template.Context({'project': project, 'detailed': detailed}, autoescape=autoescape)
+            )
+        cards.append(card)
+    if rendered:
+        cache.set_many(rendered, PAGE_CACHE_TIMEOUT)
+    return cards
+
+
+@register.simple_tag(takes_context=True)
+def project_cards(context, projects, detailed=False):
+    """Render project cards, see render_project_cards()"""
+    cards = render_project_cards(projects, detailed, context.template.engine, context.autoescape)
+    return mark_safe(''.join(cards))
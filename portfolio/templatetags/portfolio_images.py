@@ -0,0 +1,46 @@
+from django import template
+from django.core.files.storage import default_storage
+from django.forms.utils import flatatt
+from django.utils.html import format_html
+
+from portfolio.images import derivative_name, get_derivatives
+
+
+register = template.Library()
+
+
+@register.simple_tag
+def responsive_image(field, sizes='100vw', **attrs):
+    """
+    Render an uploaded image as a <picture> with WebP and JPEG srcsets.
+
+    Extra keyword arguments become attributes of the <img>, e.g.
+    ``{% responsive_image project.image sizes="(min-width: 992px) 33vw, 100vw" alt=project.title class="card-img-top" %}``
+    Images without generated derivatives fall back to the original file.
+    """
+    if not field:
+        return ''
+    attrs.setdefault('loading', 'lazy')
+    attrs.setdefault('decoding', 'async')
+
+    metadata = get_derivatives(field.name)
+    if metadata is None:
+        return format_html('<img src="{}"{}>', field.url, flatatt(attrs))
+
+    variants = metadata['variants']
+
+    def srcset(ext):
+        return ', '.join(
+            f'{default_storage.url(derivative_name(field.name, width, ext))} {width}w'
+            for width, height in variants
+        )
+
+    width, height = variants[-1]
+    img_attrs = dict(attrs, width=width, height=height, sizes=sizes, srcset=srcset('jpg'))
+    return format_html(
+        '<picture><source type="image/webp" srcset="{}" sizes="{}"><img src="{}"{}></picture>',
+        srcset('webp'),
+        sizes,
+        default_storage.url(derivative_name(field.name, width, 'jpg')),
+        flatatt(img_attrs),
+    )
@@ -0,0 +1,24 @@
+from io import StringIO
+
+from django.core.management import call_command
+from django.test import TransactionTestCase
+
+
+class ContactWriteStressTests(TransactionTestCase):
+    # The writers commit from their own threads and processes, so the test
+    # database is not wrapped in a transaction
+
+    def stress(self, **options):
+        out = StringIO()
+        # Raises CommandError on any "database is locked" error
+        call_command('stress_contact_writes', current_database=True, duration=2, stdout=out, **options)
+        self.assertIn('No lock errors', out.getvalue())
+
+    def test_direct_writes(self):
+        self.stress()
+
+    def test_direct_writes_from_several_processes(self):
+        self.stress(processes=4)
+
+    def test_coalesced_writes(self):
+        self.stress(coalesce=True)
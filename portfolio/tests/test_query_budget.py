@@ -0,0 +1,12 @@
+from io import StringIO
+
+from django.core.management import call_command
+from django.test import TestCase
+
+
+class QueryBudgetTests(TestCase):
+    def test_every_url_within_budget(self):
+        # Raises CommandError listing every URL over its budget
+        out = StringIO()
+        call_command('check_query_budget', current_database=True, projects=200, stdout=out)
+        self.assertIn('All URLs are within their query budgets', out.getvalue())
@@ -0,0 +1,12 @@
+from io import StringIO
+
+from django.core.management import call_command
+from django.test import TestCase
+
+
+class QueryPlanTests(TestCase):
+    def test_no_full_scans_or_temporary_sorts(self):
+        # Raises CommandError listing every offending query plan
+        out = StringIO()
+        call_command('check_query_plans', current_database=True, projects=1000, messages=2000, stdout=out)
+        self.assertIn('No full table scans or temporary sorts', out.getvalue())
@@ -0,0 +1,138 @@
+"""
+Token-bucket rate limiting for the contact form.
+
+Each key (client IP, sender email) owns a bucket holding up to ``burst``
+tokens that refills at ``rate`` tokens per second; a request spends one token
+or is throttled. Buckets live in process memory by default, or in the Django
+cache to share them between workers.
+
+Behind reverse proxies the peer address is the proxy's, so the client address
+is read from CLIENT_IP_HEADER, skipping the TRUSTED_PROXY_HOPS entries the
+proxies appended.
+"""
+import threading
+import time
+from collections import OrderedDict
+
+from django.conf import settings
+from django.core.cache import cache
+
+
+class TokenBucket:
+    """
+    In-process token buckets.
+
+    Buckets are kept in update order, so the least recently used ones sit at
+    the front: those that have refilled completely are dropped from there, and
+    past ``max_keys`` the oldest is evicted, without scanning the others.
+    """
+
+    max_keys = 10000
+
+    def __init__(self, rate, burst, scope='default'):
+        self.rate = rate
+        self.burst = burst
+        self.scope = scope
+        self._lock = threading.Lock()
+        self._buckets = OrderedDict()
+
+    def allow(self, key):
+        """Spend a token from ``key``'s bucket, returning False if it is empty"""
+        with self._lock:
+            now = time.time()
+            tokens, updated = self.load(key, now)
+            tokens = min(self.burst, tokens + (now - updated) * self.rate)
+            allowed = tokens >= 1
+            if allowed:
+                tokens -= 1
+            self.store(key, tokens, now)
+            return allowed
+
+    def load(self, key, now):
+        return self._buckets.get(key, (self.burst, now))
+
+    def store(self, key, tokens, now):
+        self._buckets[key] = (tokens, now)
+        self._buckets.move_to_end(key)
+        self._prune(now)
+
+    def _prune(self, now):
+        # Buckets that have refilled completely carry no state worth keeping
+        refill = self.burst / self.rate
+        while self._buckets:
+            key, (tokens, updated) = next(iter(self._buckets.items()))
+            if now - updated < refill and len(self._buckets) <= self.max_keys:
+                break
+            del self._buckets[key]
+
+
+class CacheTokenBucket(TokenBucket):
+    """
+    Limits stored in the Django cache, shared by every worker using it.
+
+    A bucket read and written back by several workers loses updates, so each
+    key instead counts its requests per window of ``burst / rate`` seconds
+    with cache.add() and cache.incr(), allowing ``burst`` per window. This is
+    the same long-run rate, with at most two bursts back to back around a
+    window boundary. add() and incr() are atomic on memcached and Redis; the
+    file and local-memory backends only make them atomic within one process.
+    """
+
+    def allow(self, key):
+        window = max(1, int(self.burst / self.rate))
+        cache_key = f'throttle:{self.scope}:{key}:{int(time.time() // window)}'
+        cache.add(cache_key, 0, window + 1)
+        try:
+            count = cache.incr(cache_key)
+        except ValueError:
+            # Expired or evicted between add() and incr()
+            cache.add(cache_key, 1, window + 1)
+            count = 1
+        return count <= self.burst
+
+
+CONTACT_RATE_LIMIT = getattr(settings, 'CONTACT_RATE_LIMIT', {
+    'rate': 1 / 60,
+    'burst': 5,
+    'backend': 'memory',
+})
+
+CLIENT_IP_HEADER = getattr(settings, 'CLIENT_IP_HEADER', 'HTTP_X_FORWARDED_FOR')
+TRUSTED_PROXY_HOPS = getattr(settings, 'TRUSTED_PROXY_HOPS', 0)
+
+_contact_bucket = None
+
+
+def contact_bucket():
+    global _contact_bucket
+    if _contact_bucket is None:
+        bucket_class = CacheTokenBucket if CONTACT_RATE_LIMIT['backend'] == 'cache' else TokenBucket
+        _contact_bucket = bucket_class(
+            CONTACT_RATE_LIMIT['rate'], CONTACT_RATE_LIMIT['burst'], scope='contact'
+        )
+    return _contact_bucket
+
+
+def client_ip(request):
+    """
+    Address of the client, as seen by the outermost trusted proxy.
+
+    Each of the TRUSTED_PROXY_HOPS proxies appends the address it received
+    the request from to CLIENT_IP_HEADER, so the client is that many entries
+    from the end; anything before it was sent by the client and is ignored.
+    """
+    if TRUSTED_PROXY_HOPS:
+        forwarded = [value.strip() for value in request.META.get(CLIENT_IP_HEADER, '').split(',')]
+        forwarded = [value for value in forwarded if value]
+        if len(forwarded) >= TRUSTED_PROXY_HOPS:
+            return forwarded[-TRUSTED_PROXY_HOPS]
+    return request.META.get('REMOTE_ADDR', '')
+
+
+def is_contact_throttled(request):
+    """Check the client IP and the submitted email against their buckets"""
+    bucket = contact_bucket()
+    if not bucket.allow('ip:' + client_ip(request)):
+        return True
+    email = request.POST.get('email', '').strip().lower()
+    return bool(email) and not bucket.allow('email:' + email)
@@ -0,0 +1,307 @@
+"""
+Streaming export and import of the portfolio content.
+
+The format is JSON lines: a header line, then one object per record with a
+``type`` key, in dependency order (portfolio, technologies, skills,
+projects, certificates, recommendations), then a trailer holding the number
+of records, so a truncated file is rejected. Records keep their primary keys,
+except technologies, which are identified by name; projects list the names
+of their technologies. File fields hold the stored file names only, so copy
+MEDIA_ROOT alongside the export.
+
+Both directions work one batch at a time, so memory stays flat however many
+records there are. Import upserts each batch with one executemany of an
+``INSERT ... ON CONFLICT`` statement compiled once per model, and resolves the
+technologies of a batch of projects with one query.
+"""
+import json
+from contextlib import contextmanager
+from functools import lru_cache
+
+from django.core.exceptions import FieldDoesNotExist, ValidationError
+from django.core.management.color import no_style
+from django.db import DEFAULT_DB_ALIAS, connection, connections, transaction
+from django.db.models.constants import OnConflict
+
+from .models import Portfolio, Project, Skill, Technology, Certificate, Recommendation
+from .seeding import insert_links
+
+
+FORMAT = 'portfolio-export'
+VERSION = 2
+# Version 1 exports have no trailer
+SUPPORTED_VERSIONS = (1, 2)
+TRAILER = 'end'
+
+MODELS = {
+    'portfolio': Portfolio,
+    'technology': Technology,
+    'skill': Skill,
+    'project': Project,
+    'certificate': Certificate,
+    'recommendation': Recommendation,
+}
+
+
+class InvalidExport(ValueError):
+    pass
+
+
+def field_names(model):
+    """Exported attribute names of ``model``; technologies have no exported id"""
+    names = [field.attname for field in model._meta.concrete_fields]
+    if model is Technology:
+        names.remove('id')
+    return names
+
+
+def encode(value):
+    # Full isoformat keeps the microseconds DjangoJSONEncoder would drop
+    if hasattr(value, 'isoformat'):
+        return value.isoformat()
+    raise TypeError(f'{type(value).__name__} is not JSON serializable')
+
+
+def dumps(record):
+    return json.dumps(record, default=encode, ensure_ascii=False, separators=(',', ':'))
+
+
+def iter_rows(model, batch_size):
+    """Yield lists of ``values()`` rows in primary key order, using keyset batches"""
+    fields = field_names(model)
+    queryset = model.objects.order_by('pk').values('pk', *fields)
+    last_pk = None
+    while True:
+        batch = list((queryset if last_pk is None else queryset.filter(pk__gt=last_pk))[:batch_size])
+        if not batch:
+            return
+        last_pk = batch[-1]['pk']
+        for row in batch:
+            del row['pk']
+        yield batch
+
+
+def project_technologies(project_ids):
+    """Return ``{project id: [technology name]}`` with one query"""
+    through = Project.technologies.through
+    names = {}
+    for project_id, name in (through.objects.filter(project_id__in=project_ids)
+                             .order_by('id').values_list('project_id', 'technology__name')):
+        names.setdefault(project_id, []).append(name)
+    return names
+
+
+def export_records(batch_size=1000):
+    """Yield the header, every record of the content models and the trailer as dicts"""
+    yield {'format': FORMAT, 'version': VERSION}
+    count = 0
+    for type_name, model in MODELS.items():
+        for rows in iter_rows(model, batch_size):
+            if model is Project:
+                technologies = project_technologies([row['id'] for row in rows])
+                for row in rows:
+                    row['technologies'] = technologies.get(row['id'], [])
+            for row in rows:
+                yield {'type': type_name, **row}
+            count += len(rows)
+    yield {'type': TRAILER, 'records': count}
+
+
+@contextmanager
+def keep_timestamps():
+    """Let bulk_create store the exported created_at/updated_at values"""
+    fields = [
+        field for model in MODELS.values() for field in model._meta.concrete_fields
+        if getattr(field, 'auto_now', False) or getattr(field, 'auto_now_add', False)
+    ]
+    saved = [(field, field.auto_now, field.auto_now_add) for field in fields]
+    for field in fields:
+        field.auto_now = field.auto_now_add = False
+    try:
+        yield
+    finally:
+        for field, auto_now, auto_now_add in saved:
+            field.auto_now, field.auto_now_add = auto_now, auto_now_add
+
+
+def build_instance(model, record):
+    fields = {}
+    for name, value in record.items():
+        try:
+            field = model._meta.get_field(name)
+        except FieldDoesNotExist:
+            raise InvalidExport(f'{model._meta.model_name} has no field {name!r}')
+        try:
+            fields[field.attname] = field.to_python(value) if value is not None else None
+        except ValidationError as exc:
+            raise InvalidExport(f'{model._meta.model_name}.{name}: {"; ".join(exc.messages)}')
+    return model(**fields)
+
+
+def technology_ids(names):
+    """Return ``{name: id}``, creating the technologies that do not exist yet"""
+    found = {}
+    # One query; the oldest technology wins if a name is duplicated
+    for tech_id, name in Technology.objects.filter(name__in=names).order_by('-id').values_list('id', 'name'):
+        found[name] = tech_id
+    missing = [Technology(name=name) for name in names if name not in found]
+    if missing:
+        Technology.objects.bulk_create(missing)
+        found.update(Technology.objects.filter(name__in=[t.name for t in missing]).values_list('name', 'id'))
+    return found
+
+
+def upsert_technologies(records):
+    # Matched by name, as technology ids differ between databases
+    instances = {record['name']: build_instance(Technology, record) for record in records}
+    found = dict(Technology.objects.filter(name__in=instances).order_by('-id').values_list('name', 'id'))
+    for name, instance in instances.items():
+        instance.id = found.get(name)
+    Technology.objects.bulk_update([t for t in instances.values() if t.id is not None], ['color'])
+    Technology.objects.bulk_create([t for t in instances.values() if t.id is None])
+
+
+@lru_cache(maxsize=None)
+def upsert_statement(model):
+    """
+    Return ``(sql, fields)``: a one-row INSERT ... ON CONFLICT (id) DO UPDATE
+    for ``model`` and the fields its parameters are taken from, in order.
+
+    Compiling bulk_create's SQL and building model instances for every
+    batch took most of the time of a large import.
+    """
+    fields = [model._meta.get_field(name) for name in field_names(model)]
+    quote_name = connection.ops.quote_name
+    return ' '.join([
+        'INSERT INTO {} ({}) VALUES ({})'.format(
+            quote_name(model._meta.db_table),
+            ', '.join(quote_name(field.column) for field in fields),
+            ', '.join(['%s'] * len(fields)),
+        ),
+        connection.ops.on_conflict_suffix_sql(
+            fields, OnConflict.UPDATE,
+            [field.column for field in fields if not field.primary_key],
+            [model._meta.pk.column],
+        ),
+    ]), fields
+
+
+def row_params(model, fields, record, db):
+    """Database values of ``record`` in the order of ``fields``"""
+    unknown = record.keys() - {field.attname for field in fields}
+    if unknown:
+        raise InvalidExport(f'{model._meta.model_name} has no field {min(unknown)!r}')
+    params = []
+    for field in fields:
+        value = record[field.attname] if field.attname in record else field.get_default()
+        try:
+            if value is not None:
+                value = field.to_python(value)
+        except ValidationError as exc:
+            raise InvalidExport(f'{model._meta.model_name}.{field.name}: {"; ".join(exc.messages)}')
+        params.append(field.get_db_prep_save(value, db))
+    return params
+
+
+def upsert(model, records):
+    sql, fields = upsert_statement(model)
+    # The connection itself, as every attribute read through the proxy costs a lookup
+    db = connections[DEFAULT_DB_ALIAS]
+    with db.cursor() as cursor:
+        cursor.executemany(sql, [row_params(model, fields, record, db) for record in records])
+
+
+def upsert_projects(records):
+    tech_names = {record['id']: record.pop('technologies', []) for record in records}
+    upsert(Project, records)
+    ids = technology_ids({name for names in tech_names.values() for name in names})
+    # Replace the technology links of the whole batch
+    Project.technologies.through.objects.filter(project_id__in=list(tech_names)).delete()
+    insert_links([
+        (project_id, ids[name])
+        for project_id, names in tech_names.items() for name in dict.fromkeys(names)
+    ])
+
+
+def upsert_portfolio(records):
+    # The site has a single profile; keep the id of the existing one
+    current = Portfolio.objects.order_by('pk').values_list('pk', flat=True).first()
+    if current is not None:
+        records[-1]['id'] = current
+    upsert(Portfolio, records[-1:])
+
+
+def flush(type_name, records, counts):
+    if not records:
+        return
+    if type_name == 'technology':
+        upsert_technologies(records)
+    elif type_name == 'project':
+        upsert_projects(records)
+    elif type_name == 'portfolio':
+        upsert_portfolio(records)
+    else:
+        upsert(MODELS[type_name], records)
+    counts[type_name] = counts.get(type_name, 0) + len(records)
+
+
+@transaction.atomic
+def import_records(lines, batch_size=1000, progress=None):
+    """
+    Upsert the records of an export, given as an iterable of JSON lines.
+    Returns ``{type: count}``. Nothing is imported if any line is invalid
+    or the trailer is missing or disagrees with the records read.
+    """
+    lines = iter(lines)
+    try:
+        header = json.loads(next(lines))
+    except (StopIteration, ValueError):
+        raise InvalidExport('Not a portfolio export: missing header line')
+    if header.get('format') != FORMAT or header.get('version') not in SUPPORTED_VERSIONS:
+        raise InvalidExport(f'Unsupported export format {header.get("format")!r} version {header.get("version")!r}')
+
+    counts = {}
+    batch, batch_type = [], None
+    trailer = None
+    with keep_timestamps():
+        for number, line in enumerate(lines, start=2):
+            if not line.strip():
+                continue
+            if trailer is not None:
+                raise InvalidExport(f'Line {number}: record after the trailer')
+            try:
+                record = json.loads(line)
+                type_name = record.pop('type')
+            except (ValueError, KeyError, AttributeError):
+                raise InvalidExport(f'Line {number}: not a record')
+            if type_name == TRAILER:
+                trailer = record
+                continue
+            if type_name not in MODELS:
+                raise InvalidExport(f'Line {number}: unknown record type {type_name!r}')
+            if type_name != batch_type or len(batch) >= batch_size:
+                flush(batch_type, batch, counts)
+                if progress and batch:
+                    progress(batch_type, counts[batch_type])
+                batch, batch_type = [], type_name
+            batch.append(record)
+        flush(batch_type, batch, counts)
+        if progress and batch:
+            progress(batch_type, counts[batch_type])
+
+    if header['version'] >= 2:
+        if trailer is None:
+            raise InvalidExport('The export is truncated: its trailer is missing')
+        if trailer.get('records') != sum(counts.values()):
+            raise InvalidExport(
+                f'The export is truncated: its trailer lists {trailer.get("records")} records, '
+                f'{sum(counts.values())} were read'
+            )
+
+    # Explicit ids leave PostgreSQL sequences behind
+    statements = connection.ops.sequence_reset_sql(no_style(), list(MODELS.values()))
+    if statements:
+        with connection.cursor() as cursor:
+            for sql in statements:
+                cursor.execute(sql)
+    return counts
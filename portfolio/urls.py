@@ -1,11 +1,22 @@
+from django.conf import settings
 from django.urls import path
-from . import views
-
-urlpatterns = [
-    path('', views.home, name='home'),
-    path('about/', views.about, name='about'),
-    path('projects/', views.projects, name='projects'),
-    path('projects/<int:project_id>/', views.project_detail, name='project_detail'),
-    path('contact/', views.contact, name='contact'),
-    path('api/filter-projects/', views.filter_projects, name='filter_projects'),
-]
+from . import async_views, views
+
+
+def build_urlpatterns(public_views):
+    """URL patterns serving the read-only pages from ``public_views``"""
+    return [
+        path('', public_views.home, name='home'),
+        path('about/', public_views.about, name='about'),
+        path('projects/', public_views.projects, name='projects'),
+        path('projects/<int:project_id>/', public_views.project_detail, name='project_detail'),
+        path('contact/', views.contact, name='contact'),
+        path('api/filter-projects/', public_views.filter_projects, name='filter_projects'),
+        path('api/project-index/<int:version>.json', views.project_index, name='project_index'),
+        path('search/', views.search, name='search'),
+        path('api/search/', views.search_api, name='search_api'),
+        path('metrics', views.metrics, name='metrics'),
+    ]
+
+
+urlpatterns = build_urlpatterns(async_views if settings.ASYNC_VIEWS else views)
@@ -1,104 +1,209 @@
 from django.shortcuts import render, redirect
 from django.contrib import messages
-from django.core.mail import send_mail
 from django.conf import settings
-from django.http import JsonResponse
+from django.core.serializers.json import DjangoJSONEncoder
+from django.http import Http404, HttpResponse, JsonResponse, StreamingHttpResponse
+from django.urls import reverse
+from django.utils.crypto import constant_time_compare
 from django.views.decorators.http import require_http_methods
 from django.views.decorators.csrf import csrf_exempt
 import json
 
-from .models import (
-    Portfolio, Project, Skill, Technology, 
-    Certificate, Recommendation, ContactMessage
-)
+from .models import Project
 from .forms import ContactForm
+from .cache import cached_page, conditional_content, get_content_version
+from .tech_index import get_index, parse_tech_query
+from .search import search as full_text_search
+from .templatetags.portfolio_cards import render_project_cards
+from .snapshot import get_snapshot
+from .metrics import registry
+from .serving import IMMUTABLE_CACHE_CONTROL, accepted_encodings
+from .throttling import is_contact_throttled
+from .write_queue import contact_write_queue, save_contact_message
+from .pagination import (
+    PAGE_SIZE, InvalidCursor, decode_cursor, encode_cursor, keyset_filter, parse_limit
+)
+
+
+def projects_in_order(projects, ids):
+    """Fetch the given projects in the order of ``ids``, sorting in Python instead of SQL"""
+    by_id = projects.in_bulk(ids)
+    return [by_id[pk] for pk in ids if pk in by_id]
+
+
+def parse_ids(request):
+    """Return the project IDs of ``?ids=1,2,3``, or None without the parameter"""
+    raw = request.GET.get('ids')
+    if raw is None:
+        return None
+    return [int(value) for value in raw.split(',') if value.strip().isdigit()]
+
+
+def project_page(request, limit):
+    """
+    Return one keyset page of filtered projects and the cursor of the next page.
+
+    ``?ids=`` instead returns the listed projects, for the cards main.js has
+    not loaded yet. Raises InvalidCursor for a malformed ``?cursor=``.
+    """
+    after = decode_cursor(request.GET.get('cursor'))
+    projects = Project.objects.prefetch_related('technologies').order_by('order', '-created_at', 'id')
+    ids = parse_ids(request)
+    if ids is not None:
+        return projects_in_order(projects, ids[:limit]), None
+    names, match_all = parse_tech_query(request)
+    if names:
+        page = projects_in_order(projects, get_index().page(names, match_all, after, limit + 1))
+    else:
+        if after is not None:
+            projects = keyset_filter(projects, after)
+        page = list(projects[:limit + 1])
+    next_cursor = encode_cursor(page[limit - 1]) if len(page) > limit else None
+    return page[:limit], next_cursor
+
+
+# GET parameters read by project_page() and search_results(), which key their cached pages
+PROJECT_QUERY_PARAMS = ('tech', 'mode', 'cursor', 'ids')
+SEARCH_QUERY_PARAMS = ('q', 'limit', 'offset')
+
+STREAM_CHUNK_SIZE = 500
+
+
+def iter_filtered_projects(request, chunk_size=STREAM_CHUNK_SIZE):
+    """Yield every filtered project in public order, fetching ``chunk_size`` rows at a time"""
+    projects = Project.objects.prefetch_related('technologies').order_by('order', '-created_at', 'id')
+    names, match_all = parse_tech_query(request)
+    if not names:
+        yield from projects.iterator(chunk_size=chunk_size)
+        return
+    ids = get_index().lookup(names, match_all)
+    for start in range(0, len(ids), chunk_size):
+        yield from projects_in_order(projects, ids[start:start + chunk_size])
+
+
+def filter_config():
+    """Settings main.js filters the projects page with, passed through json_script"""
+    return {
+        'index': reverse('project_index', kwargs={'version': get_content_version()[0]}),
+        'pageSize': PAGE_SIZE,
+    }
+
+
+def project_data(project):
+    """JSON representation of a project used by the filter API"""
+    return {
+        'id': project.id,
+        'title': project.title,
+        'short_description': project.short_description,
+        'image_url': project.image.url if project.image else '',
+        'live_url': project.live_url,
+        'source_url': project.source_url,
+        'technologies': [{'name': tech.name, 'color': tech.color} for tech in project.technologies.all()],
+    }
+
 
+def filter_payload(request, projects, next_cursor):
+    """
+    Body of a filter API page: the projects' data, or with ``?cards=1`` their
+    cards as rendered on the projects page, which main.js inserts as they are.
+    """
+    if request.GET.get('cards') == '1':
+        cards = render_project_cards(projects, detailed=True)
+        return {
+            'cards': [{'id': project.id, 'html': card} for project, card in zip(projects, cards)],
+            'next': next_cursor,
+        }
+    return {'projects': [project_data(project) for project in projects], 'next': next_cursor}
 
+
+def stream_projects_json(projects):
+    """Encode projects as the filter API payload one object at a time"""
+    yield '{"projects": ['
+    for position, project in enumerate(projects):
+        yield (', ' if position else '') + json.dumps(project_data(project), cls=DjangoJSONEncoder)
+    yield '], "next": null}'
+
+
+@conditional_content
+@cached_page('home')
 def home(request):
     """Homepage view"""
-    try:
-        portfolio = Portfolio.objects.first()
-    except Portfolio.DoesNotExist:
-        portfolio = None
-    
-    featured_projects = Project.objects.filter(featured=True).order_by('order')[:3]
-    all_projects = Project.objects.all().order_by('order')[:6]
-    skills = Skill.objects.all().order_by('order', 'name')[:8]
+    snapshot = get_snapshot()
+    featured_projects = Project.objects.filter(featured=True).prefetch_related('technologies').order_by('order')[:3]
+    all_projects = Project.objects.prefetch_related('technologies').order_by('order')[:6]
     
     context = {
-        'portfolio': portfolio,
+        'portfolio': snapshot.portfolio,
         'featured_projects': featured_projects,
         'all_projects': all_projects,
-        'skills': skills,
+        'skills': snapshot.skills[:8],
     }
     return render(request, 'portfolio/home.html', context)
 
 
+@conditional_content
+@cached_page('about')
 def about(request):
     """About page view"""
-    try:
-        portfolio = Portfolio.objects.first()
-    except Portfolio.DoesNotExist:
-        portfolio = None
-    
-    skills = Skill.objects.all().order_by('order', 'name')
-    certificates = Certificate.objects.all().order_by('order', '-issue_date')
-    recommendations = Recommendation.objects.all().order_by('order', 'recommender_name')
-    
-    # Group skills by category
-    skill_categories = {}
-    for skill in skills:
-        category = skill.category
-        if category not in skill_categories:
-            skill_categories[category] = []
-        skill_categories[category].append(skill)
-    
+    snapshot = get_snapshot()
     context = {
-        'portfolio': portfolio,
-        'skill_categories': skill_categories,
-        'certificates': certificates,
-        'recommendations': recommendations,
+        'portfolio': snapshot.portfolio,
+        'skill_categories': snapshot.skill_categories,
+        'certificates': snapshot.certificates,
+        'recommendations': snapshot.recommendations,
     }
     return render(request, 'portfolio/about.html', context)
 
 
-def projects(request):
-    """Projects page view"""
-    projects = Project.objects.all().order_by('order', '-created_at')
-    technologies = Technology.objects.all().order_by('name')
-    
-    # Filter by technology if specified
-    selected_tech = request.GET.get('tech')
-    if selected_tech:
-        projects = projects.filter(technologies__name__icontains=selected_tech)
-    
-    context = {
+def projects_context(request, projects, next_cursor):
+    """Template context of the projects page showing ``projects``"""
+    snapshot = get_snapshot()
+    return {
+        'portfolio': snapshot.portfolio,
         'projects': projects,
-        'technologies': technologies,
-        'selected_tech': selected_tech,
+        'next_cursor': next_cursor,
+        'technologies': snapshot.technologies,
+        'selected_tech': request.GET.get('tech'),
+        'match_mode': request.GET.get('mode', ''),
+        'filter_config': filter_config(),
     }
-    return render(request, 'portfolio/projects.html', context)
+
+
+@conditional_content
+@cached_page('projects', query_params=PROJECT_QUERY_PARAMS)
+def projects(request):
+    """Projects page view"""
+    try:
+        projects, next_cursor = project_page(request, PAGE_SIZE)
+    except InvalidCursor:
+        return redirect('projects')
+    return render(request, 'portfolio/projects.html', projects_context(request, projects, next_cursor))
 
 
 def contact(request):
     """Contact page view"""
     if request.method == 'POST':
+        # Checked before validation so floods never reach the database
+        if is_contact_throttled(request):
+            messages.error(request, 'You are sending messages too quickly. Please try again later.')
+            form = ContactForm(initial=request.POST.dict())
+            context = {'portfolio': get_snapshot().portfolio, 'form': form}
+            return render(request, 'portfolio/contact.html', context, status=429)
+
         form = ContactForm(request.POST)
         if form.is_valid():
-            # Save to database
-            contact_message = form.save()
-            
-            # Send email (in production, you'd configure proper email settings)
-            try:
-                send_mail(
-                    f'New Contact Message from {contact_message.name}',
-                    f'Name: {contact_message.name}\nEmail: {contact_message.email}\nMessage: {contact_message.message}',
-                    settings.EMAIL_HOST_USER,
-                    [settings.ADMIN_EMAIL],
-                    fail_silently=False,
-                )
-            except Exception as e:
-                print(f"Email sending failed: {e}")
+            # Save the message and queue its notification together; the
+            # send_outbox worker delivers it outside the request
+            if settings.CONTACT_WRITE_COALESCING:
+                try:
+                    contact_write_queue.submit(form.save(commit=False))
+                except TimeoutError:
+                    # Withdrawn from the queue unsaved, so a retry cannot duplicate it
+                    messages.error(request, 'The server is busy right now. Please try sending your message again.')
+                    context = {'portfolio': get_snapshot().portfolio, 'form': form}
+                    return render(request, 'portfolio/contact.html', context, status=503)
+            else:
+                save_contact_message(form.save(commit=False))
             
             messages.success(request, 'Thank you for your message! I will get back to you soon.')
             return redirect('contact')
@@ -106,45 +211,116 @@ def contact(request):
         form = ContactForm()
     
     context = {
+        'portfolio': get_snapshot().portfolio,
         'form': form,
     }
     return render(request, 'portfolio/contact.html', context)
 
 
+@conditional_content
+@cached_page('project_detail', object_kwarg='project_id')
 def project_detail(request, project_id):
     """Project detail view"""
     try:
-        project = Project.objects.get(id=project_id)
+        project = Project.objects.prefetch_related('technologies').get(id=project_id)
     except Project.DoesNotExist:
         messages.error(request, 'Project not found.')
         return redirect('projects')
     
     context = {
+        'portfolio': get_snapshot().portfolio,
         'project': project,
     }
     return render(request, 'portfolio/project_detail.html', context)
 
 
 @require_http_methods(["GET"])
+@conditional_content
 def filter_projects(request):
-    """AJAX endpoint for filtering projects by technology"""
-    tech_name = request.GET.get('tech', '')
+    """
+    AJAX endpoint for filtering projects by technology, one keyset page at a time.
+
+    With ``?stream=1`` every matching project is sent in a single streamed
+    response instead, keeping memory flat regardless of the result size.
+    """
+    if request.GET.get('stream') == '1':
+        return StreamingHttpResponse(
+            stream_projects_json(iter_filtered_projects(request)),
+            content_type='application/json',
+        )
+
+    try:
+        projects, next_cursor = project_page(request, parse_limit(request))
+    except InvalidCursor:
+        return JsonResponse({'error': 'Invalid cursor'}, status=400)
     
-    if tech_name:
-        projects = Project.objects.filter(technologies__name__icontains=tech_name).order_by('order', '-created_at')
+    return JsonResponse(filter_payload(request, projects, next_cursor))
+
+
+@require_http_methods(["GET"])
+def project_index(request, version):
+    """
+    Technology → project index that main.js filters the projects page with.
+
+    The URL names the content version the index belongs to, so responses are
+    cached for good; requests for an older version are sent to the current one.
+    """
+    current = get_content_version()[0]
+    if version != current:
+        return redirect('project_index', version=current)
+    index = get_index()
+    if 'gzip' in accepted_encodings(request.META.get('HTTP_ACCEPT_ENCODING', '')):
+        response = HttpResponse(index.as_json_gzip(), content_type='application/json')
+        response.headers['Content-Encoding'] = 'gzip'
     else:
-        projects = Project.objects.all().order_by('order', '-created_at')
-    
-    projects_data = []
-    for project in projects:
-        projects_data.append({
-            'id': project.id,
-            'title': project.title,
-            'short_description': project.short_description,
-            'image_url': project.image.url if project.image else '',
-            'live_url': project.live_url,
-            'source_url': project.source_url,
-            'technologies': [{'name': tech.name, 'color': tech.color} for tech in project.technologies.all()],
-        })
-    
-    return JsonResponse({'projects': projects_data})
+        response = HttpResponse(index.as_json(), content_type='application/json')
+    response.headers['Vary'] = 'Accept-Encoding'
+    response.headers['Cache-Control'] = IMMUTABLE_CACHE_CONTROL
+    return response
+
+
+def search_results(request):
+    """Return ``(query, results, next_offset)`` for ``?q=&limit=&offset=``"""
+    query = request.GET.get('q', '').strip()
+    limit = parse_limit(request)
+    try:
+        offset = max(0, int(request.GET.get('offset', 0)))
+    except ValueError:
+        offset = 0
+    results = full_text_search(query, limit + 1, offset)
+    next_offset = offset + limit if len(results) > limit else None
+    return query, results[:limit], next_offset
+
+
+@conditional_content
+@cached_page('search', query_params=SEARCH_QUERY_PARAMS)
+def search(request):
+    """Search page view"""
+    query, results, next_offset = search_results(request)
+
+    context = {
+        'portfolio': get_snapshot().portfolio,
+        'query': query,
+        'results': results,
+        'next_offset': next_offset,
+    }
+    return render(request, 'portfolio/search.html', context)
+
+
+@require_http_methods(["GET"])
+@conditional_content
+@cached_page('search', query_params=SEARCH_QUERY_PARAMS)
+def search_api(request):
+    """JSON search endpoint returning ranked results with highlighted snippets"""
+    query, results, next_offset = search_results(request)
+    return JsonResponse({'results': results, 'next': next_offset})
+
+
+@require_http_methods(["GET"])
+def metrics(request):
+    """Per-route request histograms in the Prometheus text format, for staff or the metrics token"""
+    token = getattr(settings, 'METRICS_TOKEN', None)
+    authorization = request.headers.get('Authorization', '')
+    if not (token and constant_time_compare(authorization, f'Bearer {token}')) and not request.user.is_staff:
+        raise Http404
+    return HttpResponse(registry.render(), content_type='text/plain; version=0.0.4; charset=utf-8')
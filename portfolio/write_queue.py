@@ -0,0 +1,109 @@
+"""
+Contact-form inserts, one transaction per message or grouped.
+
+SQLite has a single writer lock, so a burst of requests each opening their
+own write transaction mostly waits on each other. With
+CONTACT_WRITE_COALESCING enabled, requests hand their unsaved ContactMessage
+to one writer thread per process, which inserts everything queued so far
+(plus the matching outbox rows) in a single transaction. Each request still
+waits until its own row is committed. If a batch fails, its rows are retried
+one at a time so only the offending request sees the error, and a request
+that times out before its row is picked up is withdrawn, never written.
+"""
+import queue
+import threading
+from concurrent.futures import Future
+
+from django.db import close_old_connections
+
+from .db import immediate_atomic
+from .models import ContactMessage, EmailOutbox
+
+
+def save_contact_message(contact_message):
+    """Insert an unsaved message and its outbox row in one write transaction"""
+    with immediate_atomic():
+        contact_message.save()
+        EmailOutbox.objects.create(contact_message=contact_message)
+    return contact_message
+
+
+class ContactWriteQueue:
+    """Batches ContactMessage inserts from many threads into few transactions"""
+
+    def __init__(self, max_batch=200, max_delay=0.005, timeout=30):
+        self.max_batch = max_batch
+        self.max_delay = max_delay
+        self.timeout = timeout
+        self._queue = queue.Queue()
+        self._lock = threading.Lock()
+        self._thread = None
+
+    def submit(self, contact_message):
+        """
+        Queue an unsaved message and block until it is committed.
+
+        Raises TimeoutError if the writer has not picked the message up within
+        ``timeout`` seconds; the message is then dropped from the queue.
+        """
+        future = Future()
+        self._ensure_writer()
+        self._queue.put((contact_message, future))
+        try:
+            return future.result(self.timeout)
+        except TimeoutError:
+            if future.cancel():
+                raise
+            # Already being written: its transaction is about to finish
+            return future.result()
+
+    def _ensure_writer(self):
+        with self._lock:
+            if self._thread is None or not self._thread.is_alive():
+                self._thread = threading.Thread(
+                    target=self._run, name='contact-write-queue', daemon=True
+                )
+                self._thread.start()
+
+    def _next_batch(self):
+        batch = [self._queue.get()]
+        while len(batch) < self.max_batch:
+            try:
+                batch.append(self._queue.get(timeout=self.max_delay))
+            except queue.Empty:
+                break
+        # Skip messages whose request already gave up waiting
+        return [(item, future) for item, future in batch if future.set_running_or_notify_cancel()]
+
+    @staticmethod
+    def _insert(items):
+        with immediate_atomic():
+            created = ContactMessage.objects.bulk_create(items)
+            EmailOutbox.objects.bulk_create(
+                [EmailOutbox(contact_message=item) for item in created]
+            )
+
+    def _run(self):
+        while True:
+            batch = self._next_batch()
+            if not batch:
+                continue
+            close_old_connections()
+            try:
+                self._insert([item for item, _ in batch])
+            except Exception:
+                # Retry one by one so a bad row only fails its own request
+                for item, future in batch:
+                    item.pk = None
+                    try:
+                        self._insert([item])
+                    except Exception as exc:
+                        future.set_exception(exc)
+                    else:
+                        future.set_result(item)
+            else:
+                for item, future in batch:
+                    future.set_result(item)
+
+
+contact_write_queue = ContactWriteQueue()
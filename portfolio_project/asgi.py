@@ -7,5 +7,6 @@ import os
 from django.core.asgi import get_asgi_application
 
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'portfolio_project.settings')
+os.environ.setdefault('PORTFOLIO_ASYNC_VIEWS', '1')
 
 application = get_asgi_application()
@@ -16,6 +16,9 @@ DEBUG = True
 
 ALLOWED_HOSTS = []
 
+# Bearer token that lets scrapers read /metrics without logging in as staff
+METRICS_TOKEN = os.environ.get('PORTFOLIO_METRICS_TOKEN') or None
+
 # Application definition
 INSTALLED_APPS = [
     'django.contrib.admin',
@@ -28,7 +31,10 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
+    'portfolio.middleware.ServerTimingMiddleware',
     'django.middleware.security.SecurityMiddleware',
+    # Collected static files, served before sessions and URL routing
+    'portfolio.serving.StaticFilesMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
     'django.middleware.csrf.CsrfViewMiddleware',
@@ -41,7 +47,8 @@ ROOT_URLCONF = 'portfolio_project.urls'
 
 TEMPLATES = [
     {
-        'BACKEND': 'django.template.backends.django.DjangoTemplates',
+        # DjangoTemplates that reports render time to the Server-Timing middleware
+        'BACKEND': 'portfolio.metrics.TimedDjangoTemplates',
         'DIRS': [BASE_DIR / 'templates'],
         'APP_DIRS': True,
         'OPTIONS': {
@@ -50,21 +57,50 @@ TEMPLATES = [
                 'django.template.context_processors.request',
                 'django.contrib.auth.context_processors.auth',
                 'django.contrib.messages.context_processors.messages',
+                'portfolio.context_processors.static_export',
             ],
         },
     },
 ]
 
 WSGI_APPLICATION = 'portfolio_project.wsgi.application'
+ASGI_APPLICATION = 'portfolio_project.asgi.application'
+
+# Route the read-only pages to the async views in portfolio/async_views.py;
+# asgi.py turns this on by default
+ASYNC_VIEWS = os.environ.get('PORTFOLIO_ASYNC_VIEWS') == '1'
 
 # Database
 DATABASES = {
     'default': {
         'ENGINE': 'django.db.backends.sqlite3',
         'NAME': BASE_DIR / 'db.sqlite3',
+        'OPTIONS': {
+            # Seconds a writer waits for the lock before "database is locked"
+            'timeout': 20,
+        },
+        # A file rather than memory, so the stress test case can write to it
+        # from several threads and processes
+        'TEST': {'NAME': BASE_DIR / 'test_db.sqlite3'},
+    }
+}
+
+# Commit contact-form messages in batched transactions from a single writer
+# thread (see portfolio/write_queue.py) instead of one transaction per request
+CONTACT_WRITE_COALESCING = False
+
+# Cache (rendered pages of the public views)
+# The file backend is shared by every worker process on the host, so
+# invalidations made by an admin edit are seen by all of them.
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.filebased.FileBasedCache',
+        'LOCATION': BASE_DIR / 'cache',
     }
 }
 
+PAGE_CACHE_TIMEOUT = 60 * 60 * 24
+
 # Password validation
 AUTH_PASSWORD_VALIDATORS = [
     {
@@ -94,9 +130,25 @@ STATICFILES_DIRS = [
 ]
 STATIC_ROOT = BASE_DIR / 'staticfiles'
 
+STORAGES = {
+    'default': {
+        'BACKEND': 'django.core.files.storage.FileSystemStorage',
+    },
+    # collectstatic writes minified, content-hashed and pre-compressed files
+    'staticfiles': {
+        'BACKEND': 'portfolio.storage.CompressedManifestStaticFilesStorage',
+    },
+}
+
 # Media files
 MEDIA_URL = '/media/'
 MEDIA_ROOT = BASE_DIR / 'media'
+MEDIA_CACHE_CONTROL = 'public, max-age=3600'
+# Let the web server send media files: 'x-accel-redirect' (nginx, with an
+# internal location at MEDIA_OFFLOAD_PREFIX aliased to MEDIA_ROOT) or
+# 'x-sendfile' (Apache mod_xsendfile, lighttpd)
+MEDIA_OFFLOAD = os.environ.get('MEDIA_OFFLOAD') or None
+MEDIA_OFFLOAD_PREFIX = '/protected-media/'
 
 # Default primary key field type
 DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
@@ -111,3 +163,26 @@ EMAIL_HOST_PASSWORD = ''
 
 # Admin email for contact form
 ADMIN_EMAIL = 'admin@example.com'
+
+# Contact form throttling: each client IP and sender email may send `burst`
+# messages at once, refilled at `rate` per second. Use the 'cache' backend to
+# share the limits between worker processes; it needs a cache with atomic
+# incr(), such as memcached or Redis, to be exact across processes.
+CONTACT_RATE_LIMIT = {
+    'rate': 1 / 60,
+    'burst': 5,
+    'backend': 'memory',
+}
+
+# Behind reverse proxies, the number of them that append the client address
+# to CLIENT_IP_HEADER. 0 uses the peer address (REMOTE_ADDR).
+CLIENT_IP_HEADER = 'HTTP_X_FORWARDED_FOR'
+TRUSTED_PROXY_HOPS = int(os.environ.get('PORTFOLIO_TRUSTED_PROXY_HOPS', 0))
+
+# Identical messages from the same sender within this many seconds are rejected
+CONTACT_DUPLICATE_WINDOW = 60 * 60 * 24
+
+# archive_messages moves contact messages older than this many days to
+# compressed monthly files in CONTACT_ARCHIVE_DIR
+CONTACT_RETENTION_DAYS = 365
+CONTACT_ARCHIVE_DIR = BASE_DIR / 'archive' / 'messages'
@@ -1,16 +1,21 @@
 """
 URL configuration for portfolio_project project.
 """
+import re
+
 from django.contrib import admin
-from django.urls import path, include
+from django.urls import path, include, re_path
 from django.conf import settings
 from django.conf.urls.static import static
 
+from portfolio.serving import serve_media
+
 urlpatterns = [
     path('admin/', admin.site.urls),
+    # Resumable, cacheable downloads in production too
+    re_path(r'^%s(?P<path>.+)$' % re.escape(settings.MEDIA_URL.lstrip('/')), serve_media, name='media'),
     path('', include('portfolio.urls')),
 ]
 
 if settings.DEBUG:
-    urlpatterns += static(settings.MEDIA_URL, document_root=settings.MEDIA_ROOT)
     urlpatterns += static(settings.STATIC_URL, document_root=settings.STATIC_ROOT)
@@ -29,11 +29,12 @@ document.addEventListener('DOMContentLoaded', function() {
     });
 
     // Project filtering functionality
+    document.querySelectorAll('#projects-grid .project-item[data-project-id]').forEach(registerProjectCard);
     const filterButtons = document.querySelectorAll('.filter-btn');
     filterButtons.forEach(button => {
         button.addEventListener('click', function() {
             const tech = this.dataset.tech;
-            filterProjects(tech);
+            showProjects(tech);
             
             // Update active button
             filterButtons.forEach(btn => btn.classList.remove('active'));
@@ -41,6 +42,31 @@ document.addEventListener('DOMContentLoaded', function() {
         });
     });
 
+    // Load the next page of projects
+    const loadMoreButton = document.getElementById('load-more');
+    if (loadMoreButton) {
+        loadMoreButton.addEventListener('click', function() {
+            if (localFilter) {
+                showNextProjects(localFilter, true)
+                    .catch(error => console.error('Error loading projects:', error));
+            } else {
+                filterProjects(this.dataset.tech, this.dataset.next, this.dataset.mode);
+            }
+        });
+    }
+
+    // Fetch the technology index while the page is idle, so the first
+    // filter click needs no round trip either
+    const config = projectFilterConfig();
+    if (config) {
+        const prefetch = () => loadProjectIndex(config.index).catch(() => {});
+        if ('requestIdleCallback' in window) {
+            requestIdleCallback(prefetch);
+        } else {
+            setTimeout(prefetch, 1000);
+        }
+    }
+
     // Skills progress animation
     const skillBars = document.querySelectorAll('.skill-progress');
     const observerOptions = {
@@ -63,16 +89,153 @@ document.addEventListener('DOMContentLoaded', function() {
     });
 });
 
+// Local project filtering
+// The projects page embeds the URL of a technology -> project index for the
+// current content version. Filters are resolved against it in the browser,
+// cards already on the page are reused, and only the projects not loaded
+// yet are fetched from the API, by ID.
+const projectCards = new Map();
+let projectIndex = null;
+let localFilter = null;
+
+function projectFilterConfig() {
+    const element = document.getElementById('project-filter-config');
+    return element ? JSON.parse(element.textContent) : null;
+}
+
+function registerProjectCard(card) {
+    projectCards.set(Number(card.dataset.projectId), card);
+}
+
+function normalizeTech(name) {
+    return name.toLowerCase().split(/\s+/).filter(Boolean).join(' ');
+}
+
+// Decode the gap-encoded positions of each technology
+function decodeProjectIndex(data) {
+    const techs = new Map();
+    Object.entries(data.techs).forEach(([name, gaps]) => {
+        let position = 0;
+        techs.set(name, gaps.map(gap => (position += gap)));
+    });
+    return { order: data.order, techs: techs };
+}
+
+function loadProjectIndex(url) {
+    if (!projectIndex) {
+        projectIndex = fetch(url)
+            .then(response => {
+                if (!response.ok) throw new Error(`Project index: ${response.status}`);
+                return response.json();
+            })
+            .then(decodeProjectIndex)
+            .catch(error => {
+                // Retry on the next click
+                projectIndex = null;
+                throw error;
+            });
+    }
+    return projectIndex;
+}
+
+// Project IDs matching any (or, with mode "all", every) technology, in page order
+function lookupProjects(index, tech, mode) {
+    const names = (tech || '').split(',').map(normalizeTech).filter(Boolean);
+    if (!names.length) return index.order;
+    const lists = names.map(name => index.techs.get(name) || []);
+    let positions;
+    if (mode === 'all') {
+        lists.sort((a, b) => a.length - b.length);
+        const others = lists.slice(1).map(list => new Set(list));
+        positions = lists[0].filter(position => others.every(set => set.has(position)));
+    } else {
+        positions = [...new Set(lists.flat())].sort((a, b) => a - b);
+    }
+    return positions.map(position => index.order[position]);
+}
+
+function showProjects(tech, mode) {
+    const config = projectFilterConfig();
+    if (!config) {
+        filterProjects(tech, null, mode);
+        return;
+    }
+    loadProjectIndex(config.index)
+        .then(index => {
+            localFilter = { ids: lookupProjects(index, tech, mode), shown: 0, pageSize: config.pageSize };
+            return showNextProjects(localFilter, false);
+        })
+        .catch(error => {
+            console.error('Error filtering projects locally:', error);
+            localFilter = null;
+            filterProjects(tech, null, mode);
+        });
+}
+
+// Show the next page of a local filter, fetching the cards it lacks first
+function showNextProjects(filter, append) {
+    // Ignore clicks while the previous page is still loading
+    if (filter.loading) return Promise.resolve();
+    const ids = filter.ids.slice(filter.shown, filter.shown + filter.pageSize);
+    const missing = ids.filter(id => !projectCards.has(id));
+    filter.loading = true;
+    const loaded = missing.length ? fetchProjectCards(missing) : Promise.resolve();
+    return loaded.finally(() => {
+        filter.loading = false;
+    }).then(() => {
+        // A later click has replaced this filter
+        if (filter !== localFilter) return;
+        const grid = document.getElementById('projects-grid');
+        if (!grid) return;
+        if (!append) {
+            // Detaches the cards shown so far without destroying them
+            grid.replaceChildren();
+            if (!ids.length) grid.appendChild(createNoProjectsMessage());
+        }
+        ids.forEach(id => {
+            const card = projectCards.get(id);
+            if (card) grid.appendChild(card);
+        });
+        filter.shown += ids.length;
+        toggleLoadMore(filter.shown < filter.ids.length);
+    });
+}
+
+function fetchProjectCards(ids) {
+    const params = new URLSearchParams({ ids: ids.join(','), limit: ids.length, cards: 1 });
+    return fetch(`/api/filter-projects/?${params}`)
+        .then(response => response.json())
+        .then(data => {
+            data.cards.forEach(card => createProjectCard(card.html));
+        });
+}
+
+function createNoProjectsMessage() {
+    const message = document.createElement('div');
+    message.className = 'col-12 text-center py-5';
+    message.innerHTML = `
+        <i class="fas fa-code fa-3x text-muted mb-3"></i>
+        <h4 class="text-muted">No projects found</h4>
+        <p class="text-muted">Try selecting a different technology filter.</p>
+    `;
+    return message;
+}
+
 // Project filtering function
-function filterProjects(tech) {
-    const url = tech ? `/api/filter-projects/?tech=${encodeURIComponent(tech)}` : '/api/filter-projects/';
-    
-    fetch(url)
+// Without a cursor the grid is replaced by the first page of results,
+// with one the next page is appended to it.
+function filterProjects(tech, cursor, mode) {
+    const params = new URLSearchParams({ cards: 1 });
+    if (tech) params.set('tech', tech);
+    if (mode) params.set('mode', mode);
+    if (cursor) params.set('cursor', cursor);
+    fetch(`/api/filter-projects/?${params}`)
         .then(response => response.json())
         .then(data => {
             const projectsContainer = document.getElementById('projects-container');
             if (projectsContainer) {
-                updateProjectsDisplay(data.projects);
+                updateProjectsDisplay(data.cards, Boolean(cursor));
+                updateLoadMore(data.next, tech, mode);
             }
         })
         .catch(error => {
@@ -81,42 +244,41 @@ function filterProjects(tech) {
 }
 
 // Update projects display
-function updateProjectsDisplay(projects) {
-    const container = document.getElementById('projects-container');
-    if (!container) return;
+function updateProjectsDisplay(cards, append) {
+    const grid = document.getElementById('projects-grid');
+    if (!grid) return;
 
-    container.innerHTML = '';
+    if (!append) {
+        grid.innerHTML = '';
+    }
     
-    projects.forEach(project => {
-        const projectCard = createProjectCard(project);
-        container.appendChild(projectCard);
+    cards.forEach(card => {
+        grid.appendChild(createProjectCard(card.html));
     });
 }
 
-// Create project card element
-function createProjectCard(project) {
-    const card = document.createElement('div');
-    card.className = 'col-md-6 col-lg-4 mb-4';
-    
-    const techTags = project.technologies.map(tech => 
-        `<span class="badge" style="background-color: ${tech.color}">${tech.name}</span>`
-    ).join(' ');
-    
-    card.innerHTML = `
-        <div class="card h-100 project-card">
-            <img src="${project.image_url}" class="card-img-top" alt="${project.title}">
-            <div class="card-body">
-                <h5 class="card-title">${project.title}</h5>
-                <p class="card-text">${project.short_description}</p>
-                <div class="mb-3">${techTags}</div>
-                <div class="d-flex gap-2">
-                    ${project.live_url ? `<a href="${project.live_url}" class="btn btn-primary btn-sm" target="_blank">Live Demo</a>` : ''}
-                    ${project.source_url ? `<a href="${project.source_url}" class="btn btn-outline-primary btn-sm" target="_blank">Source Code</a>` : ''}
-                </div>
-            </div>
-        </div>
-    `;
-    
+// Point the "load more" button at the next page, or hide it on the last one
+function updateLoadMore(next, tech, mode) {
+    const button = document.getElementById('load-more');
+    if (!button) return;
+
+    button.dataset.next = next || '';
+    button.dataset.tech = tech || '';
+    button.dataset.mode = mode || '';
+    toggleLoadMore(Boolean(next));
+}
+
+function toggleLoadMore(visible) {
+    const wrapper = document.getElementById('load-more-wrapper');
+    if (wrapper) wrapper.classList.toggle('d-none', !visible);
+}
+
+// Create a project card element from the server-rendered, already escaped card HTML
+function createProjectCard(html) {
+    const template = document.createElement('template');
+    template.innerHTML = html.trim();
+    const card = template.content.firstElementChild;
+    registerProjectCard(card);
     return card;
 }
 